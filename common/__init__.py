@@ -1,2 +1,3 @@
 # common/__init__.py
-from .logging import get_logger
+from .logging import get_logger, get_sampled_logger, log_context, set_log_context, ContextThreadPoolExecutor
+from .file_utils import atomic_write
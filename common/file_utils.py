@@ -0,0 +1,25 @@
+import os
+import tempfile
+
+
+def atomic_write(path: str, data: bytes):
+    """
+    Write `data` to `path` so readers see either the old file or the complete new one.
+
+    The data is written and fsynced to a temporary file in the same directory, then renamed over `path`.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
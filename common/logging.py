@@ -1,7 +1,14 @@
+import atexit
+import contextvars
+import json
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 # Define log levels
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -9,42 +16,172 @@ LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_FILE = os.getenv("LOG_FILE", "autodoc.log")
 LOG_MAX_SIZE = 10 * 1024 * 1024  # 10 MB
 LOG_BACKUP_COUNT = 3
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")
+CONTEXT_FIELDS = ("run_id", "epic", "stage")
+
+_log_context = contextvars.ContextVar("log_context", default={})
+_queue_handler = None
+_listener = None
+_setup_lock = threading.Lock()
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields (run_id, epic, stage, ...) to every log record emitted inside the block."""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def set_log_context(**fields):
+    """Update the current log context in place, e.g. to mark the next pipeline stage."""
+    _log_context.set({**_log_context.get(), **fields})
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Thread pool that runs each task in a copy of the submitting thread's context, keeping its log context."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current log context onto the record in the emitting thread."""
+
+    def filter(self, record):
+        context = _log_context.get()
+        for field in CONTEXT_FIELDS:
+            setattr(record, field, context.get(field))
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        line = super().format(record)
+        context = " ".join(f"{field}={getattr(record, field)}" for field in CONTEXT_FIELDS
+                           if getattr(record, field, None) is not None)
+        return f"{line} [{context}]" if context else line
+
+
+def _create_handlers():
+    formatter = JsonFormatter() if LOG_JSON else TextFormatter(LOG_FORMAT)
+    level = getattr(logging, LOG_LEVEL)
+
+    # Create console handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setLevel(level)
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    # Create file handler
+    try:
+        file_handler = RotatingFileHandler(
+            LOG_FILE,
+            maxBytes=LOG_MAX_SIZE,
+            backupCount=LOG_BACKUP_COUNT
+        )
+        file_handler.setLevel(level)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    except (IOError, PermissionError) as e:
+        sys.stderr.write(f"Could not create log file: {e}\n")
+    return handlers
+
+
+def _get_queue_handler() -> QueueHandler:
+    """Return the process-wide queue handler, starting the listener thread that does the actual I/O."""
+    global _queue_handler, _listener
+    with _setup_lock:
+        if _queue_handler is None:
+            log_queue = queue.SimpleQueue()
+            _listener = QueueListener(log_queue, *_create_handlers(), respect_handler_level=True)
+            _listener.start()
+            atexit.register(_listener.stop)
+            _queue_handler = QueueHandler(log_queue)
+            _queue_handler.addFilter(ContextFilter())
+    return _queue_handler
+
 
 def get_logger(name):
     """
     Get a logger with the specified name.
-    
+
+    Records are handed to a queue and written to the console and log file by a background
+    listener, so logging never blocks the calling thread on I/O.
+
     Args:
         name (str): The name of the logger, typically __name__ from the calling module
-        
+
     Returns:
         logging.Logger: A configured logger instance
     """
     logger = logging.getLogger(name)
-    
+
     # Only configure the logger if it hasn't been configured yet
     if not logger.handlers:
         logger.setLevel(getattr(logging, LOG_LEVEL))
-        
-        # Create console handler
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(getattr(logging, LOG_LEVEL))
-        console_formatter = logging.Formatter(LOG_FORMAT)
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
-        
-        # Create file handler
-        try:
-            file_handler = RotatingFileHandler(
-                LOG_FILE, 
-                maxBytes=LOG_MAX_SIZE, 
-                backupCount=LOG_BACKUP_COUNT
-            )
-            file_handler.setLevel(getattr(logging, LOG_LEVEL))
-            file_formatter = logging.Formatter(LOG_FORMAT)
-            file_handler.setFormatter(file_formatter)
-            logger.addHandler(file_handler)
-        except (IOError, PermissionError) as e:
-            logger.warning(f"Could not create log file: {e}")
-    
-    return logger
\ No newline at end of file
+        logger.addHandler(_get_queue_handler())
+
+    return logger
+
+
+class SampledLogger:
+    """
+    Logger wrapper for per-item events in hot loops.
+
+    For each distinct message template, the first `first` records are logged, then only every
+    `every`-th one, annotated with how many were suppressed. Use lazy %-style arguments so
+    disabled or suppressed records cost no formatting.
+    """
+
+    def __init__(self, logger: logging.Logger, every: int = 100, first: int = 10):
+        self.logger = logger
+        self.every = max(1, every)
+        self.first = first
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def log(self, level, msg, *args, **kwargs):
+        if not self.logger.isEnabledFor(level):
+            return
+        with self._lock:
+            count = self._counts.get(msg, 0) + 1
+            self._counts[msg] = count
+        if count <= self.first:
+            self.logger.log(level, msg, *args, stacklevel=3, **kwargs)
+        elif (count - self.first) % self.every == 0:
+            self.logger.log(level, msg + " (%d similar messages suppressed)", *args, self.every - 1,
+                            stacklevel=3, **kwargs)
+
+    def debug(self, msg, *args, **kwargs):
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs):
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs):
+        self.log(logging.WARNING, msg, *args, **kwargs)
+
+
+def get_sampled_logger(name, every: int = 100, first: int = 10) -> SampledLogger:
+    return SampledLogger(get_logger(name), every, first)
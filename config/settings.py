@@ -11,11 +11,34 @@ EPIC_KEY = os.getenv("EPIC_KEY") # This might be better handled if it changes pe
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GITHUB_ORG_NAME = os.getenv("GITHUB_ORG_NAME")
 GITHUB_REPO_PREFIX = os.getenv("GITHUB_REPO_PREFIX")
+# "api" walks the GitHub REST API; "mirror" reads local `git clone --mirror` copies kept in GIT_MIRROR_DIR
+GITHUB_BACKEND = os.getenv("GITHUB_BACKEND", "api")
+GIT_MIRROR_DIR = os.getenv("GIT_MIRROR_DIR", "./git_mirrors")
+GIT_REMOTE_URL_TEMPLATE = os.getenv("GIT_REMOTE_URL_TEMPLATE", "https://github.com/{org}/{repo}.git")
+GIT_MIRROR_ALL_BRANCHES = os.getenv("GIT_MIRROR_ALL_BRANCHES", "false").lower() in ("1", "true", "yes") # Index every branch, not just the default one
 
 CHANGELOG_OUTPUT_FILE = os.getenv("CHANGELOG_OUTPUT_FILE", "changelog.md") # Provide a default
 DEFAULT_GOOGLE_API_KEY = os.getenv("DEFAULT_GOOGLE_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", DEFAULT_GOOGLE_API_KEY) # Handle fallback
 
+# LLM execution limits, shared by every summarization call in the process
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "120")) # Seconds per call attempt
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "60")) # Seconds before a hedged request is sent; 0 disables
+
+# Per-card summarization budget; lower-ranked commits are folded into a digest
+CARD_MAX_COMMITS = int(os.getenv("CARD_MAX_COMMITS", "15"))
+CARD_DIFF_CHAR_BUDGET = int(os.getenv("CARD_DIFF_CHAR_BUDGET", "30000"))
+
 # Consider adding constants for file paths like JIRA_DATA_FILE and COMMIT_DIFFS_DIR if they are fixed.
 JIRA_DATA_FILE = "jira.json"
 COMMIT_DIFFS_DIR = "./commit_diffs"
+# Per-run workspaces (commit diffs, changelog) and how long finished ones are kept
+WORKSPACES_DIR = os.getenv("WORKSPACES_DIR", "./workspaces")
+WORKSPACE_TTL_SECONDS = float(os.getenv("WORKSPACE_TTL_SECONDS", str(24 * 60 * 60)))
+# Fingerprints and page URLs of the last published run per epic, used to skip unchanged epics
+RUN_STATE_DIR = os.getenv("RUN_STATE_DIR", "./run_state")
+COMMIT_DIFFS_COMPRESSION = os.getenv("COMMIT_DIFFS_COMPRESSION", "zstd") # "zstd" or "none"
+COMMIT_DIFFS_WRITERS = int(os.getenv("COMMIT_DIFFS_WRITERS", "4")) # Background diff writer threads
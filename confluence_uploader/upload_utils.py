@@ -1,10 +1,16 @@
 import os
+from typing import Optional
+
 import requests
 
 # --- Markdown Utils ---
-def convert_markdown_to_html(file_path: str) -> str:
-    with open(file_path, 'r') as f:
-        markdown_text = f.read()
+def convert_markdown_to_html(file_path: Optional[str] = None, markdown_text: Optional[str] = None) -> str:
+    # Prefer the in-memory changelog; reading a file is kept for callers that only have a path
+    if markdown_text is None:
+        if file_path is None:
+            raise ValueError("convert_markdown_to_html needs either markdown_text or file_path")
+        with open(file_path, 'r') as f:
+            markdown_text = f.read()
     return markdown_text
 
 # --- Confluence API ---
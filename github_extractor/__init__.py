@@ -1,4 +1,6 @@
 # github_extractor/__init__.py
 from .github_client import GitHubClient
+from .git_mirror import GitMirrorClient, GitMirrorError
 from .card_commit_scanner import CardCommitScanner
+from .diff_store import DiffStore, DiffStoreError, DiffWriter
 from .save_utils import save_diffs_to_files # Exposing this as per instruction to consider it.
@@ -0,0 +1,207 @@
+import json
+import os
+import uuid
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from common import ContextThreadPoolExecutor, atomic_write, get_logger
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency; diffs are stored uncompressed without it
+    zstandard = None
+
+# Initialize logger
+logger = get_logger(__name__)
+
+INDEX_SUFFIX = ".index.json"
+DATA_SUFFIX = ".diffs"
+METADATA_FIELDS = ("repo", "sha", "message", "date")
+
+
+class DiffStoreError(Exception):
+    """Raised when a stored card file or its index is unreadable or inconsistent."""
+
+
+class DiffStore:
+    """
+    Per-card commit diff storage.
+
+    Each card is stored as a data file of independently encoded (optionally zstd-compressed)
+    commit records plus an index listing every commit's metadata and byte range. Both are written
+    atomically, and the index is written last and names its data file, so a crash mid-write leaves
+    the previous version of the card intact. Readers use the index to load only the commits they need.
+    """
+
+    def __init__(self, directory: str, compression: str = "zstd"):
+        self.directory = Path(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed; storing commit diffs uncompressed")
+            compression = "none"
+        if compression not in ("zstd", "none"):
+            raise ValueError(f"Unsupported diff compression: {compression}")
+        self.compression = compression
+
+    def _index_path(self, card_number: str) -> Path:
+        return self.directory / f"{card_number}{INDEX_SUFFIX}"
+
+    def _encode(self, record: Dict, compressor) -> bytes:
+        data = json.dumps(record).encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    def write_card(self, card_number: str, results: List[Dict]) -> Path:
+        """Store the scanned commits of a card, replacing any previous version. Returns the index path."""
+        compressor = zstandard.ZstdCompressor() if self.compression == "zstd" else None
+        data_name = f"{card_number}.{uuid.uuid4().hex[:12]}{DATA_SUFFIX}"
+
+        chunks = []
+        entries = []
+        offset = 0
+        for result in sorted(results, key=lambda x: x["repo"]):
+            chunk = self._encode(result, compressor)
+            entry = {field: result.get(field) for field in METADATA_FIELDS}
+            entry.update(offset=offset, length=len(chunk))
+            entries.append(entry)
+            chunks.append(chunk)
+            offset += len(chunk)
+
+        previous = self.read_index(card_number, missing_ok=True, strict=False)
+        index = {
+            "card": card_number,
+            "data_file": data_name,
+            "compression": self.compression,
+            "commits": entries,
+        }
+        atomic_write(str(self.directory / data_name), b"".join(chunks))
+        atomic_write(str(self._index_path(card_number)), json.dumps(index).encode("utf-8"))
+
+        if previous and previous.get("data_file") != data_name:
+            try:
+                os.remove(self.directory / previous["data_file"])
+            except OSError:
+                pass
+        logger.debug("Stored %s commits for card %s in %s", len(entries), card_number, data_name)
+        return self._index_path(card_number)
+
+    def read_index(self, card_number: str, missing_ok: bool = True, strict: bool = True) -> Optional[Dict]:
+        """Return the card's index, or None if the card has not been stored."""
+        try:
+            with open(self._index_path(card_number), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            if missing_ok:
+                return None
+            raise
+        except (ValueError, OSError) as e:
+            if not strict:
+                return None
+            raise DiffStoreError(f"Corrupt diff index for card {card_number}: {e}") from e
+
+    def has_card(self, card_number: str) -> bool:
+        return self._index_path(card_number).exists() or self._legacy_path(card_number).exists()
+
+    def load_commits(self, card_number: str, shas: Optional[Iterable[str]] = None) -> Optional[List[Dict]]:
+        """
+        Load a card's commits (including diffs), optionally only those whose sha is in `shas`.
+
+        The pipeline reads whole cards; `shas` is for callers that need a few commits, e.g. to
+        re-summarize selected ones, and reads only their byte ranges. Returns None if the card has not been stored; raises DiffStoreError if its files are corrupt.
+        """
+        index = self.read_index(card_number)
+        if index is None:
+            return self._load_legacy(card_number, shas)
+
+        wanted = set(shas) if shas is not None else None
+        entries = [e for e in index["commits"] if wanted is None or e["sha"] in wanted]
+        decompressor = zstandard.ZstdDecompressor() if index.get("compression") == "zstd" else None
+        if index.get("compression") == "zstd" and zstandard is None:
+            raise DiffStoreError(f"Card {card_number} is zstd-compressed but zstandard is not installed")
+
+        commits = []
+        data_path = self.directory / index["data_file"]
+        try:
+            with open(data_path, "rb") as f:
+                for entry in entries:
+                    f.seek(entry["offset"])
+                    chunk = f.read(entry["length"])
+                    if len(chunk) != entry["length"]:
+                        raise DiffStoreError(f"Truncated record for commit {entry['sha']} in {data_path}")
+                    if decompressor:
+                        chunk = decompressor.decompress(chunk)
+                    commits.append(json.loads(chunk))
+        except DiffStoreError:
+            raise
+        except Exception as e:
+            raise DiffStoreError(f"Unreadable diff data for card {card_number} in {data_path}: {e}") from e
+        return commits
+
+    def _legacy_path(self, card_number: str) -> Path:
+        return self.directory / f"{card_number}.json"
+
+    def _load_legacy(self, card_number: str, shas: Optional[Iterable[str]]) -> Optional[List[Dict]]:
+        # Files written by earlier versions: one JSON object of commits grouped by repository
+        try:
+            with open(self._legacy_path(card_number), "r", encoding="utf-8") as f:
+                grouped = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (ValueError, OSError) as e:
+            raise DiffStoreError(f"Corrupt diff file for card {card_number}: {e}") from e
+        wanted = set(shas) if shas is not None else None
+        return [c for commits in grouped.values() for c in commits if wanted is None or c["sha"] in wanted]
+
+
+class DiffWriter:
+    """
+    Background writer that persists cards to a DiffStore off the fetch path.
+
+    Cards are written in parallel and independently: a failure is recorded for that card only
+    and reported by `wait()`. Writes submitted for the same card run one after another in
+    submission order, so the last one wins and a failed write is never hidden by a later one.
+    """
+
+    def __init__(self, store: DiffStore, max_workers: int = 4):
+        self.store = store
+        self._pool = ContextThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="diff-writer")
+        self._futures: Dict[str, List[Future]] = {}
+
+    def _write_after(self, previous: Optional[Future], card_number: str, results: List[Dict]):
+        if previous is not None:
+            # The previous write was queued first, so it is already running or done
+            try:
+                previous.result()
+            except Exception:
+                pass  # Reported by wait() for that write
+        return self.store.write_card(card_number, results)
+
+    def submit(self, card_number: str, results: List[Dict]):
+        logger.debug("Queueing %s commits for card %s for writing", len(results), card_number)
+        futures = self._futures.setdefault(card_number, [])
+        previous = futures[-1] if futures else None
+        futures.append(self._pool.submit(self._write_after, previous, card_number, list(results)))
+
+    def wait(self) -> Dict[str, Exception]:
+        """Wait for all queued writes and return the cards with a failed write, mapped to the first error."""
+        failures = {}
+        for card_number, futures in self._futures.items():
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error("Error saving diffs for card %s: %s", card_number, e)
+                    failures.setdefault(card_number, e)
+        self._futures = {}
+        return failures
+
+    def close(self) -> Dict[str, Exception]:
+        failures = self.wait()
+        self._pool.shutdown(wait=True)
+        return failures
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,272 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import subprocess
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from common import ContextThreadPoolExecutor, atomic_write, get_logger, get_sampled_logger
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows; mirrors are then only locked within the process
+    fcntl = None
+
+# Initialize logger
+logger = get_logger(__name__)
+commit_logger = get_sampled_logger(__name__)
+
+DEFAULT_REMOTE_URL_TEMPLATE = "https://github.com/{org}/{repo}.git"
+CARD_KEY_PATTERN = re.compile(r"\b[A-Z][A-Z0-9_]+-\d+\b")
+INDEX_FILE = "autodoc-card-index.json"
+LOG_FORMAT = "%H%x00%aI%x00%B%x1e"
+
+# Per-mirror locks shared by every client in the process (main.py creates one client per request)
+_mirror_locks: Dict[str, threading.Lock] = {}
+_mirror_locks_guard = threading.Lock()
+
+
+class GitMirrorError(Exception):
+    """Raised when a git command against a mirror fails."""
+
+
+class GitMirrorClient:
+    """
+    GitHub backend that reads commits from local `git clone --mirror` copies instead of the REST API.
+
+    Mirrors are brought up to date with an incremental `git fetch` the first time a repository is
+    used by a client. Each mirror keeps an inverted index from card keys to commits, extended by
+    scanning only commits that are new since the last sync, and diffs are produced locally.
+    Implements the interface `CardCommitScanner` uses, so it can replace `GitHubClient`.
+
+    Like the REST backend, only the default branch is indexed. With `all_branches=True` commits on
+    every branch are indexed too, including unmerged work and branches of squash-merged pull
+    requests, whose changes then appear twice. Syncs of a mirror are serialized across threads and,
+    where `fcntl` is available, across processes.
+    """
+
+    def __init__(self, mirror_dir: str, org_name: str, token: Optional[str] = None,
+                 remote_url_template: str = DEFAULT_REMOTE_URL_TEMPLATE,
+                 repo_lister: Optional[Callable[[str], List[str]]] = None, all_branches: bool = False):
+        logger.debug("Initializing git mirror client for organization %s in %s", org_name, mirror_dir)
+        self.mirror_dir = Path(mirror_dir)
+        self.org_name = org_name
+        self.token = token
+        self.remote_url_template = remote_url_template
+        # Lists repository names for a prefix; defaults to the mirrors already on disk
+        self.repo_lister = repo_lister
+        self.all_branches = all_branches
+        self._indexes: Dict[str, Dict] = {}
+        os.makedirs(self.mirror_dir, exist_ok=True)
+
+    def _mirror_path(self, repo: str) -> Path:
+        return self.mirror_dir / f"{repo}.git"
+
+    def _remote_url(self, repo: str) -> str:
+        return self.remote_url_template.format(org=self.org_name, repo=repo)
+
+    def _git(self, args: List[str], repo: Optional[str] = None, input_text: Optional[str] = None) -> str:
+        command = ["git"]
+        env = None
+        if self.token and self._remote_url(repo or "").startswith("https://"):
+            # Passed through the environment, not argv (visible in `ps`) or the mirror's config
+            credentials = base64.b64encode(f"x-access-token:{self.token}".encode()).decode()
+            env = dict(os.environ)
+            count = int(env.get("GIT_CONFIG_COUNT", "0"))
+            env.update({"GIT_CONFIG_COUNT": str(count + 1),
+                        f"GIT_CONFIG_KEY_{count}": "http.extraHeader",
+                        f"GIT_CONFIG_VALUE_{count}": f"Authorization: Basic {credentials}"})
+        if repo is not None and args[0] not in ("clone", "ls-remote"):
+            command += ["-C", str(self._mirror_path(repo))]
+        result = subprocess.run(command + args, input=input_text, capture_output=True, text=True,
+                                encoding="utf-8", errors="replace", env=env)
+        if result.returncode != 0:
+            raise GitMirrorError(f"git {args[0]} failed for {repo}: {result.stderr.strip()}")
+        return result.stdout
+
+    @contextmanager
+    def _lock(self, repo: str):
+        """Hold the mirror's lock: a process-wide thread lock, then an exclusive file lock for other processes."""
+        key = str(self._mirror_path(repo).resolve())
+        with _mirror_locks_guard:
+            thread_lock = _mirror_locks.setdefault(key, threading.Lock())
+        with thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.mirror_dir / f"{repo}.lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get_org_repos(self, prefix: str = "") -> List[str]:
+        if self.repo_lister:
+            repos = self.repo_lister(prefix)
+        else:
+            repos = sorted(p.name[:-len(".git")] for p in self.mirror_dir.glob("*.git") if p.is_dir())
+            repos = [repo for repo in repos if repo.startswith(prefix)]
+        logger.info("Found a total of %d repositories with prefix '%s'", len(repos), prefix)
+        return repos
+
+    def sync(self, repo: str) -> Dict:
+        """Clone or fetch the repository's mirror and update its card index; returns the index."""
+        with self._lock(repo):
+            if repo in self._indexes:
+                return self._indexes[repo]
+
+            path = self._mirror_path(repo)
+            if path.exists():
+                logger.debug("Fetching updates for mirror: %s", path)
+                self._git(["fetch", "--prune", "--quiet", "origin"], repo)
+            else:
+                logger.info("Creating mirror of %s in %s", repo, path)
+                self._git(["clone", "--mirror", "--quiet", self._remote_url(repo), str(path)], repo)
+
+            index = self._update_index(repo)
+            self._indexes[repo] = index
+            return index
+
+    @property
+    def _scope(self) -> str:
+        return "branches" if self.all_branches else "HEAD"
+
+    def _load_index(self, repo: str) -> Dict:
+        empty = {"scope": self._scope, "tips": [], "cards": {}}
+        try:
+            with open(self._mirror_path(repo) / INDEX_FILE, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        # An index built for the other branch scope can't be extended incrementally
+        return index if index.get("scope") == self._scope else empty
+
+    def _tips(self, repo: str) -> List[str]:
+        if self.all_branches:
+            return self._git(["for-each-ref", "--format=%(objectname)", "refs/heads"], repo).split()
+        try:
+            return [self._git(["rev-parse", "--verify", "HEAD^{commit}"], repo).strip()]
+        except GitMirrorError:
+            return []  # Empty repository
+
+    def _update_index(self, repo: str) -> Dict:
+        index = self._load_index(repo)
+        tips = self._tips(repo)
+        if sorted(tips) == sorted(index["tips"]):
+            logger.debug("Card index of %s is up to date", repo)
+            return index
+
+        # A dropped tip that is no longer reachable means history was rewritten (force-push or deleted
+        # branch): entries for the dropped commits can't be told apart, so the index is rebuilt from scratch
+        dropped = [sha for sha in index["tips"] if sha not in tips]
+        if any(not self._reachable(repo, sha) for sha in dropped):
+            logger.info("History of %s was rewritten; rebuilding its card index", repo)
+            index = {"scope": self._scope, "tips": [], "cards": {}}
+
+        commits = []
+        if tips:
+            # Only walk commits not reachable from the tips indexed last time
+            revisions = "--branches" if self.all_branches else "HEAD"
+            commits = self._log(repo, [revisions, "--stdin"], input_text="".join(f"^{sha}\n" for sha in index["tips"]))
+
+        new_entries: Dict[str, List[Dict]] = {}
+        scanned = len(commits)
+        for commit in commits:
+            for card in set(CARD_KEY_PATTERN.findall(commit["message"])):
+                new_entries.setdefault(card, []).append(commit)
+
+        # New commits are newer, so they go first like the REST API's newest-first order
+        for card, entries in new_entries.items():
+            seen = {entry["sha"] for entry in entries}
+            index["cards"][card] = entries + [e for e in index["cards"].get(card, []) if e["sha"] not in seen]
+        index["tips"] = tips
+        atomic_write(str(self._mirror_path(repo) / INDEX_FILE), json.dumps(index).encode("utf-8"))
+        logger.info("Indexed %d new commits in %s (%d card keys)", scanned, repo, len(new_entries))
+        return index
+
+    def _log(self, repo: str, args: List[str], input_text: Optional[str] = None) -> List[Dict]:
+        output = self._git(["log", *args, f"--format={LOG_FORMAT}"], repo, input_text=input_text)
+        commits = []
+        for record in output.split("\x1e"):
+            record = record.strip("\n")
+            if not record:
+                continue
+            sha, date, message = record.split("\x00", 2)
+            commits.append({"sha": sha, "message": message.strip(), "date": date})
+        return commits
+
+    def _reachable(self, repo: str, sha: str) -> bool:
+        try:
+            if self.all_branches:
+                return bool(self._git(["branch", "--contains", sha], repo).strip())
+            self._git(["merge-base", "--is-ancestor", sha, "HEAD"], repo)
+            return True
+        except GitMirrorError:
+            # Not an ancestor, or pruned from the mirror's object store
+            return False
+
+    def get_repo_head(self, repo: str) -> Optional[str]:
+        """
+        Get the remote's indexed head without fetching, or None if it cannot be read.
+
+        This is the default branch SHA ("" for an empty repository), or with `all_branches` a
+        fingerprint of every branch head, so it changes whenever the index would.
+        """
+        if self.all_branches:
+            args = ["ls-remote", "--heads", self._remote_url(repo)]
+        else:
+            args = ["ls-remote", self._remote_url(repo), "HEAD"]
+        try:
+            output = self._git(args, repo)
+        except GitMirrorError as e:
+            logger.warning("Could not read heads of %s: %s", repo, e)
+            return None
+        if not self.all_branches:
+            return output.split()[0] if output.strip() else ""
+        heads = sorted(line.strip() for line in output.splitlines() if line.strip())
+        return hashlib.sha256("\n".join(heads).encode("utf-8")).hexdigest()
+
+    def get_repo_heads(self, repos: List[str], max_workers: int = 8) -> Dict[str, Optional[str]]:
+        """Get the heads fingerprint of each repository, read in parallel."""
+        logger.debug("Reading head SHAs for %d repositories", len(repos))
+        with ContextThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(repos, pool.map(self.get_repo_head, repos)))
+
+    def get_new_commits(self, repo: str, base: str, head: str) -> Optional[List[Dict]]:
+        """
+        Get the default-branch commits after `base`, syncing the mirror first.
+
+        Returns None if they can't be listed incrementally: with `all_branches` (heads are fingerprints,
+        and card lookups in the index are cheap anyway) or when history was rewritten.
+        """
+        if self.all_branches:
+            return None
+        self.sync(repo)
+        if not self._reachable(repo, base):
+            logger.info("History of %s was rewritten since %.7s", repo, base)
+            return None
+        return [{"repo": repo, **commit} for commit in self._log(repo, [f"{base}..HEAD"])]
+
+    def get_commits_with_card(self, repo: str, card_number: str) -> List[Dict]:
+        logger.info("Looking up commits for repository: %s containing card number: %s", repo, card_number)
+        # Sync failures propagate: an empty result would silently drop the card's commits
+        index = self.sync(repo)
+        commits = [{"repo": repo, **entry} for entry in index["cards"].get(card_number, [])]
+        logger.info("Found a total of %d commits matching card number: %s in repository: %s",
+                    len(commits), card_number, repo)
+        return commits
+
+    def get_commit_diff(self, repo: str, sha: str) -> str:
+        """Get the raw diff of a commit (against its first parent for merges)."""
+        commit_logger.debug("Generating diff for commit: %.7s in repository: %s", sha, repo)
+        try:
+            diff = self._git(["show", "--format=", "--no-color", "--diff-merges=first-parent", sha], repo)
+        except GitMirrorError as e:
+            logger.error("Error generating diff for commit: %.7s in repository: %s: %s", sha, repo, e)
+            return f"Error fetching diff: {e}"
+        return diff.lstrip("\n")
@@ -1,15 +1,17 @@
 import requests
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-from common import get_logger # Updated import
+from common import ContextThreadPoolExecutor, get_logger, get_sampled_logger # Updated import
 
 # Initialize logger
 logger = get_logger(__name__)
+# Per-commit events are sampled to keep DEBUG runs from flooding the log
+commit_logger = get_sampled_logger(__name__)
 
 
 class GitHubClient:
     def __init__(self, token: str, org_name: str):
-        logger.debug(f"Initializing GitHub client for organization: {org_name}")
+        logger.debug("Initializing GitHub client for organization: %s", org_name)
         self.token = token
         self.org_name = org_name
         self.headers = {
@@ -19,12 +21,12 @@ class GitHubClient:
         logger.debug("GitHub client initialized successfully")
 
     def get_org_repos(self, prefix: str = "") -> List[str]:
-        logger.info(f"Fetching repositories for organization: {self.org_name} with prefix: '{prefix}'")
+        logger.info("Fetching repositories for organization: %s with prefix: '%s'", self.org_name, prefix)
         repos = []
         page = 1
         while True:
             url = f"https://api.github.com/orgs/{self.org_name}/repos?per_page=100&page={page}"
-            logger.debug(f"Fetching page {page} of repositories")
+            logger.debug("Fetching page %d of repositories", page)
             res = requests.get(url, headers=self.headers)
             if res.status_code != 200:
                 error_msg = f"Error fetching repos: {res.text}"
@@ -32,7 +34,7 @@ class GitHubClient:
                 raise Exception(error_msg)
             data = res.json()
             if not data:
-                logger.debug(f"No more repositories found on page {page}")
+                logger.debug("No more repositories found on page %d", page)
                 break
             # Apply prefix filter
             filtered_repos = 0
@@ -40,35 +42,35 @@ class GitHubClient:
                 if repo["name"].startswith(prefix):
                     repos.append(repo["name"])
                     filtered_repos += 1
-            logger.debug(f"Found {filtered_repos} repositories with prefix '{prefix}' on page {page}")
+            logger.debug("Found %d repositories with prefix '%s' on page %d", filtered_repos, prefix, page)
             page += 1
 
-        logger.info(f"Found a total of {len(repos)} repositories with prefix '{prefix}'")
+        logger.info("Found a total of %d repositories with prefix '%s'", len(repos), prefix)
         return repos
 
     def get_commits_with_card(self, repo: str, card_number: str) -> List[Dict]:
-        logger.info(f"Fetching commits for repository: {repo} containing card number: {card_number}")
+        logger.info("Fetching commits for repository: %s containing card number: %s", repo, card_number)
         commits = []
         url = f"https://api.github.com/repos/{self.org_name}/{repo}/commits"
         params = {"per_page": 100}
         page = 1
         while True:
             params["page"] = page
-            logger.debug(f"Fetching page {page} of commits for repository: {repo}")
+            logger.debug("Fetching page %d of commits for repository: %s", page, repo)
             res = requests.get(url, headers=self.headers, params=params)
             if res.status_code != 200:
-                logger.warning(f"Skipping {repo}: HTTP status {res.status_code}")
+                logger.warning("Skipping %s: HTTP status %d", repo, res.status_code)
                 break
             data = res.json()
             if not data:
-                logger.debug(f"No more commits found on page {page} for repository: {repo}")
+                logger.debug("No more commits found on page %d for repository: %s", page, repo)
                 break
 
             matches_on_page = 0
             for commit in data:
                 message = commit["commit"]["message"]
                 if card_number in message:
-                    logger.debug(f"Found commit {commit['sha'][:7]} matching card number: {card_number}")
+                    commit_logger.debug("Found commit %.7s matching card number: %s", commit["sha"], card_number)
                     commits.append({
                         "repo": repo,
                         "sha": commit["sha"],
@@ -77,24 +79,74 @@ class GitHubClient:
                     })
                     matches_on_page += 1
 
-            logger.debug(f"Found {matches_on_page} commits matching card number on page {page}")
+            logger.debug("Found %d commits matching card number on page %d", matches_on_page, page)
             page += 1
 
-        logger.info(f"Found a total of {len(commits)} commits matching card number: {card_number} in repository: {repo}")
+        logger.info("Found a total of %d commits matching card number: %s in repository: %s", len(commits), card_number, repo)
+        return commits
+
+    def get_new_commits(self, repo: str, base: str, head: str) -> Optional[List[Dict]]:
+        """
+        Get the commits on the default branch after `base` up to `head`, from the compare endpoint.
+
+        Returns None if they can't be listed incrementally, e.g. when a force-push removed `base`.
+        """
+        logger.debug("Comparing %s from %.7s to %.7s", repo, base, head)
+        url = f"https://api.github.com/repos/{self.org_name}/{repo}/compare/{base}...{head}"
+        params = {"per_page": 100}
+        commits = []
+        page = 1
+        while True:
+            params["page"] = page
+            res = requests.get(url, headers=self.headers, params=params)
+            if res.status_code != 200:
+                logger.warning("Could not compare %s from %.7s to %.7s: HTTP status %d", repo, base, head, res.status_code)
+                return None
+            data = res.json()
+            if data.get("status") not in ("ahead", "identical"):
+                logger.info("History of %s was rewritten since %.7s", repo, base)
+                return None
+            for commit in data.get("commits", []):
+                commits.append({
+                    "repo": repo,
+                    "sha": commit["sha"],
+                    "message": commit["commit"]["message"],
+                    "date": commit["commit"]["author"]["date"]
+                })
+            if not data.get("commits") or len(commits) >= data.get("total_commits", 0):
+                break
+            page += 1
+        logger.debug("Found %d new commits in %s", len(commits), repo)
         return commits
 
     def get_commit_diff(self, repo: str, sha: str) -> str:
         """Get the raw diff of a commit."""
-        logger.debug(f"Fetching diff for commit: {sha[:7]} in repository: {repo}")
+        commit_logger.debug("Fetching diff for commit: %.7s in repository: %s", sha, repo)
         url = f"https://api.github.com/repos/{self.org_name}/{repo}/commits/{sha}"
         diff_headers = self.headers.copy()
         diff_headers["Accept"] = "application/vnd.github.v3.diff"
         res = requests.get(url, headers=diff_headers)
         if res.status_code == 200:
-            diff_size = len(res.text)
-            logger.debug(f"Successfully fetched diff for commit: {sha[:7]} (size: {diff_size} bytes)")
+            commit_logger.debug("Successfully fetched diff for commit: %.7s (size: %d bytes)", sha, len(res.text))
             return res.text
         else:
             error_msg = f"Error fetching diff: {res.status_code}"
-            logger.error(f"{error_msg} for commit: {sha[:7]} in repository: {repo}")
+            logger.error("%s for commit: %.7s in repository: %s", error_msg, sha, repo)
             return error_msg
+
+    def get_repo_head(self, repo: str) -> Optional[str]:
+        """Get the SHA of the default branch head, or None if it cannot be fetched."""
+        url = f"https://api.github.com/repos/{self.org_name}/{repo}/commits/HEAD"
+        sha_headers = self.headers.copy()
+        sha_headers["Accept"] = "application/vnd.github.sha"
+        res = requests.get(url, headers=sha_headers)
+        if res.status_code != 200:
+            logger.warning("Could not fetch head of %s: HTTP status %d", repo, res.status_code)
+            return None
+        return res.text.strip()
+
+    def get_repo_heads(self, repos: List[str], max_workers: int = 8) -> Dict[str, Optional[str]]:
+        """Get the default branch head SHA of each repository, fetched in parallel."""
+        logger.debug("Fetching head SHAs for %d repositories", len(repos))
+        with ContextThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(repos, pool.map(self.get_repo_head, repos)))
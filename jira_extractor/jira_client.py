@@ -9,7 +9,7 @@ logger = get_logger(__name__)
 class JiraClient:
 
     def __init__(self, server: str, username: str, password: str):
-        logger.debug(f"Initializing Jira client for server: {server}")
+        logger.debug("Initializing Jira client for server: %s", server)
         self.server = server
         self.username = username
         self.password = password
@@ -17,7 +17,7 @@ class JiraClient:
         logger.debug("Jira client initialized successfully")
 
     def _connect(self) -> JIRA:
-        logger.info(f"Connecting to Jira server: {self.server}")
+        logger.info("Connecting to Jira server: %s", self.server)
         try:
             jira_options = {'server': self.server}
             jira = JIRA(options=jira_options, basic_auth=(self.username, self.password))
@@ -29,20 +29,20 @@ class JiraClient:
             raise Exception(error_msg)
 
     def get_issue(self, issue_key: str) -> Optional[JIRA]:
-        logger.debug(f"Fetching issue with key: {issue_key}")
+        logger.debug("Fetching issue with key: %s", issue_key)
         try:
             issue = self.jira.issue(issue_key)
-            logger.debug(f"Successfully fetched issue: {issue_key}")
+            logger.debug("Successfully fetched issue: %s", issue_key)
             return issue
         except Exception as e:
-            logger.error(f"Error getting issue {issue_key}: {e}")
+            logger.error("Error getting issue %s: %s", issue_key, e)
             return None
 
     def get_card_data(self, card_key: str) -> Optional[Dict]:
-        logger.info(f"Getting card data for: {card_key}")
+        logger.info("Getting card data for: %s", card_key)
         card_data = self.get_issue(card_key)
         if not card_data:
-            logger.warning(f"No card data found for key: {card_key}")
+            logger.warning("No card data found for key: %s", card_key)
             return None
 
         try:
@@ -53,19 +53,19 @@ class JiraClient:
                 "status": card_data.fields.status.name,
                 "assignee": card_data.fields.assignee.displayName if card_data.fields.assignee else 'Unassigned'
             }
-            logger.info(f"Successfully retrieved card data for: {card_key}")
-            logger.debug(f"Card title: {result['title']}, status: {result['status']}")
+            logger.info("Successfully retrieved card data for: %s", card_key)
+            logger.debug("Card title: %s, status: %s", result['title'], result['status'])
             return result
         except Exception as e:
-            logger.error(f"Error processing card data for {card_key}: {e}")
+            logger.error("Error processing card data for %s: %s", card_key, e)
             return None
 
 
     def get_epic_data(self, epic_key: str) -> Optional[Dict]:
-        logger.info(f"Getting epic data for: {epic_key}")
+        logger.info("Getting epic data for: %s", epic_key)
         epic_data = self.get_issue(epic_key)
         if not epic_data:
-            logger.warning(f"No epic data found for key: {epic_key}")
+            logger.warning("No epic data found for key: %s", epic_key)
             return None
 
         try:
@@ -75,24 +75,37 @@ class JiraClient:
                 "description": epic_data.fields.description,
                 "status": epic_data.fields.status.name,
             }
-            logger.info(f"Successfully retrieved epic data for: {epic_key}")
-            logger.debug(f"Epic title: {result['title']}, status: {result['status']}")
+            logger.info("Successfully retrieved epic data for: %s", epic_key)
+            logger.debug("Epic title: %s, status: %s", result['title'], result['status'])
             return result
         except Exception as e:
-            logger.error(f"Error processing epic data for {epic_key}: {e}")
+            logger.error("Error processing epic data for %s: %s", epic_key, e)
             return None
 
 
     def get_issues_linked_to_epic(self, epic_key: str) -> Optional[List[str]]:
-        logger.info(f"Getting issues linked to epic: {epic_key}")
+        logger.info("Getting issues linked to epic: %s", epic_key)
         try:
             jql = f'parent = {epic_key}'
-            logger.debug(f"Executing JQL query: {jql}")
+            logger.debug("Executing JQL query: %s", jql)
             issues = self.jira.search_issues(jql, fields='key')
             issue_keys = [issue.key for issue in issues]
-            logger.info(f"Found {len(issue_keys)} issues linked to epic: {epic_key}")
-            logger.debug(f"Linked issues: {', '.join(issue_keys) if issue_keys else 'None'}")
+            logger.info("Found %s issues linked to epic: %s", len(issue_keys), epic_key)
+            logger.debug("Linked issues: %s", ', '.join(issue_keys) if issue_keys else 'None')
             return issue_keys
         except Exception as e:
-            logger.error(f"Error getting linked issues for epic {epic_key}: {e}")
+            logger.error("Error getting linked issues for epic %s: %s", epic_key, e)
+            return None
+
+
+    def get_epic_updated_timestamps(self, epic_key: str) -> Optional[Dict[str, str]]:
+        """Return the `updated` timestamp of the epic and each of its child issues, from a single JQL query."""
+        logger.info("Getting updated timestamps for epic and linked issues: %s", epic_key)
+        try:
+            jql = f'key = {epic_key} OR parent = {epic_key}'
+            logger.debug("Executing JQL query: %s", jql)
+            issues = self.jira.search_issues(jql, fields='updated', maxResults=False)
+            return {issue.key: issue.fields.updated for issue in issues}
+        except Exception as e:
+            logger.error("Error getting updated timestamps for epic %s: %s", epic_key, e)
             return None
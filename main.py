@@ -8,33 +8,75 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from confluence_uploader import convert_markdown_to_html, create_confluence_page
 # CardCommitScanner is used by DataCoordinator, not directly in main.py
 # from github_extractor import CardCommitScanner 
-from github_extractor import GitHubClient 
+from github_extractor import GitHubClient, GitMirrorClient
 from jira_extractor import JiraClient
-from summarize_ai import ChangeLogGenerator
+from summarize_ai import ChangeLogGenerator, LLMExecutor, LLMRateLimiter
 from datetime import datetime
 from jira_extractor import add_comment # Updated import
 from flask import Flask, request
 import config.settings as settings
-from common import get_logger # Updated import
-from services import DataCoordinator # Updated import
+from common import get_logger, log_context, set_log_context # Updated import
+from services import ChangeCheck, ChangeDetector, DataCoordinator, RunWorkspace, cleanup_stale_workspaces, new_run_id # Updated import
 
 # Initialize logger
 logger = get_logger(__name__)
 
-def main(epic_key: str): # Added epic_key parameter
-    """Main function to orchestrate data fetching and changelog generation."""
-    logger.info(f"Starting autodoc changelog generation process for EPIC_KEY: {epic_key}")
+# Process-wide limiter so concurrent requests share one Gemini quota
+llm_rate_limiter = LLMRateLimiter(settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE)
 
-    # Initialize clients
+def create_clients():
+    """Create the Jira and GitHub clients; the GitHub backend is chosen by settings.GITHUB_BACKEND."""
     # JiraClient and GitHubClient will use settings for their respective configurations
     # These settings are loaded once from .env and are not request-specific for these clients
     jira_client = JiraClient(settings.JIRA_SERVER, settings.JIRA_USERNAME, settings.JIRA_PASSWORD)
     github_client = GitHubClient(settings.GITHUB_TOKEN, settings.GITHUB_ORG_NAME)
+    if settings.GITHUB_BACKEND == "mirror":
+        # Repositories are still listed through the API; commits and diffs come from local mirrors
+        github_client = GitMirrorClient(
+            settings.GIT_MIRROR_DIR,
+            settings.GITHUB_ORG_NAME,
+            token=settings.GITHUB_TOKEN,
+            remote_url_template=settings.GIT_REMOTE_URL_TEMPLATE,
+            repo_lister=github_client.get_org_repos,
+            all_branches=settings.GIT_MIRROR_ALL_BRANCHES,
+        )
+    return jira_client, github_client
+
+
+def main(epic_key: str, run_id: Optional[str] = None, force: bool = False): # Added epic_key parameter
+    """Main function to orchestrate data fetching and changelog generation."""
+    logger.info("Starting autodoc changelog generation process for EPIC_KEY: %s", epic_key)
+
+    # Initialize clients
+    jira_client, github_client = create_clients()
+
+    # Skip the whole pipeline when nothing about the epic changed since the last published page
+    set_log_context(stage="change_detection")
+    detector = ChangeDetector(jira_client, github_client)
+    try:
+        change_check = detector.check(epic_key, compare=not force)
+    except Exception as e:
+        logger.warning("Change detection failed for epic %s, running full pipeline: %s", epic_key, e)
+        change_check = None
+    if change_check and not change_check.changed:
+        logger.info("✅ Epic %s unchanged; existing Confluence page: %s", epic_key, change_check.page_url)
+        return f"✅ No changes since last run. Confluence page: {change_check.page_url}"
+
+    # Each run works in its own workspace so concurrent epics don't clobber each other's files
+    cleanup_stale_workspaces()
+    with RunWorkspace(run_id) as workspace:
+        return run_pipeline(epic_key, workspace, jira_client, github_client, detector, change_check)
+
+
+def run_pipeline(epic_key: str, workspace: RunWorkspace, jira_client: JiraClient, github_client: GitHubClient,
+                 detector: Optional[ChangeDetector] = None, change_check: Optional[ChangeCheck] = None):
+    """Run the pipeline for one epic, keeping all intermediate files inside `workspace`."""
 
     # Instantiate DataCoordinator
-    coordinator = DataCoordinator(jira_client, github_client)
+    coordinator = DataCoordinator(jira_client, github_client, workspace.commit_diffs_dir)
 
-    logger.info(f"Fetching Jira epic data for EPIC_KEY: {epic_key}")
+    set_log_context(stage="jira")
+    logger.info("Fetching Jira epic data for EPIC_KEY: %s", epic_key)
     # Pass the explicit epic_key to the coordinator
     epic_data = coordinator.fetch_jira_cards_for_epic(epic_key=epic_key)
 
@@ -43,40 +85,66 @@ def main(epic_key: str): # Added epic_key parameter
         return # Exit if fetching Jira data failed
 
     card_keys = [card['id'] for card in epic_data.get('cards', [])]
-    logger.info(f"Extracted {len(card_keys)} card keys from epic data")
+    logger.info("Extracted %s card keys from epic data", len(card_keys))
 
+    set_log_context(stage="github")
     logger.info("Fetching commit diffs from GitHub")
     coordinator.fetch_commit_diffs_for_cards(card_keys)
 
+    set_log_context(stage="ingest")
     logger.info("Ingesting Jira and GitHub data")
     full_epic = coordinator.ingest_jira_and_github_data(epic_data)
 
     # GOOGLE_API_KEY is already handled in settings.py with a fallback mechanism
+    set_log_context(stage="summarize")
     logger.info("Initializing LLM for changelog generation")
-    llm = ChatGoogleGenerativeAI(
+    chat_model = ChatGoogleGenerativeAI(
         model="gemini-2.0-flash",
         api_key=settings.GOOGLE_API_KEY, # Use the key from settings
         temperature=0,
         max_tokens=None,
-        timeout=None,
-        max_retries=2,
+        timeout=settings.LLM_CALL_TIMEOUT,
+        max_retries=0, # Retries are handled by LLMExecutor
+    )
+    llm = LLMExecutor(
+        chat_model,
+        rate_limiter=llm_rate_limiter,
+        timeout=settings.LLM_CALL_TIMEOUT,
+        max_retries=settings.LLM_MAX_RETRIES,
+        hedge_after=settings.LLM_HEDGE_AFTER,
     )
 
-    logger.info(f"Generating changelog and saving to {settings.CHANGELOG_OUTPUT_FILE}")
+    logger.info("Generating changelog and saving to %s", workspace.changelog_file)
     generator = ChangeLogGenerator(llm)
-    generator.generate(full_epic, settings.CHANGELOG_OUTPUT_FILE)
+    try:
+        changelog = generator.generate(full_epic, workspace.changelog_file)
+    finally:
+        llm.close()
 
     logger.info("Changelog generation completed successfully")
+    set_log_context(stage="upload")
     logger.info("Uploading to Confluence page...")
-    html = convert_markdown_to_html(settings.CHANGELOG_OUTPUT_FILE)
+    html = convert_markdown_to_html(markdown_text=changelog)
     # Use the explicit epic_key for the page title
     page_title = f"{epic_key}-Summary-{datetime.now()}"
     page_url = create_confluence_page(page_title, html)
-    logger.info(f"✅ Confluence page created: {page_url}")
+    logger.info("✅ Confluence page created: %s", page_url)
     # Pass the explicit epic_key to add_comment
     add_comment(page_url, epic_key=epic_key)
-    logger.info(f"✅ Linked to jira ticket: {epic_key}")
-    return f"✅ Confluence page created: {page_url}"
+    logger.info("✅ Linked to jira ticket: %s", epic_key)
+
+    if detector and change_check and coordinator.failed_cards:
+        # The page is missing these cards' commits, so the next run must not be skipped
+        logger.warning("Not saving run state for epic %s: %s card(s) failed", epic_key, len(coordinator.failed_cards))
+    elif detector and change_check:
+        # Remember what this page was generated from so unchanged epics can skip the next run
+        try:
+            detector.record_run(change_check, page_url, card_keys, sorted(coordinator.scanned_commits))
+        except Exception as e:
+            logger.warning("Could not save run state for epic %s: %s", epic_key, e)
+
+    logger.info("Deduplication report: %s", coordinator.dedup_report)
+    return f"✅ Confluence page created: {page_url}\nDeduplication: {coordinator.dedup_report}"
 
 # if __name__ == "__main__":
 #     # This block is for potential direct script execution, not used by Flask.
@@ -97,15 +165,21 @@ def run_job():
     if epic_key_param is None:
         # Check if a default EPIC_KEY is available in settings as a fallback
         if settings.EPIC_KEY:
-            logger.info(f"No 'epic' parameter provided, using default EPIC_KEY from settings: {settings.EPIC_KEY}")
+            logger.info("No 'epic' parameter provided, using default EPIC_KEY from settings: %s", settings.EPIC_KEY)
             epic_key_param = settings.EPIC_KEY
         else:
             logger.error("Missing 'epic' parameter in request and no default EPIC_KEY in settings.")
             return "Please provide an epic number in the 'epic' query parameter.", 400
     
-    logger.info(f"Processing request for EPIC_KEY: {epic_key_param}")
-    # Call main with the explicitly passed epic_key_param
-    return main(epic_key=epic_key_param)
+    # 'force' regenerates the page even if the epic hasn't changed since the last run
+    force = request.args.get('force', 'false').lower() in ('1', 'true', 'yes')
+
+    # Every log record of this run carries its run id and epic
+    run_id = new_run_id()
+    with log_context(run_id=run_id, epic=epic_key_param):
+        logger.info("Processing request for EPIC_KEY: %s (force=%s)", epic_key_param, force)
+        # Call main with the explicitly passed epic_key_param
+        return main(epic_key=epic_key_param, run_id=run_id, force=force)
 
 if __name__ == '__main__':
     # For local development, it's good practice to ensure the Flask app runs
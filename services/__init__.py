@@ -1,2 +1,4 @@
 # services/__init__.py
 from .data_coordinator import DataCoordinator
+from .workspace import RunWorkspace, cleanup_stale_workspaces, new_run_id
+from .change_detector import ChangeCheck, ChangeDetector
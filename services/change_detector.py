@@ -0,0 +1,136 @@
+# services/change_detector.py
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from common import atomic_write, get_logger
+import config.settings as settings
+
+logger = get_logger(__name__)
+
+
+class ChangeCheck:
+    def __init__(self, epic_key: str, jira_updated: Dict[str, str], repo_heads: Dict[str, Optional[str]],
+                 changed: bool, page_url: Optional[str] = None):
+        self.epic_key = epic_key
+        self.jira_updated = jira_updated
+        self.repo_heads = repo_heads
+        self.changed = changed
+        self.page_url = page_url
+
+    @property
+    def fingerprint(self) -> str:
+        payload = json.dumps({"jira": self.jira_updated, "heads": self.repo_heads}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ChangeDetector:
+    """
+    Cheap check of whether an epic changed since its last successful run.
+
+    The fingerprint combines the Jira `updated` timestamps of the epic and its child cards (one JQL
+    query) with the head of every scanned repository. If only repository heads moved, just the
+    commits pushed since the stored heads are listed (no diffs, no LLM), and the epic counts as
+    changed only if one of them is tagged with a card the last page covered and isn't on that page.
+    """
+
+    def __init__(self, jira_client, github_client, state_dir: Optional[str] = None):
+        self.jira_client = jira_client
+        self.github_client = github_client
+        self.state_dir = state_dir or settings.RUN_STATE_DIR
+
+    def _state_path(self, epic_key: str) -> str:
+        return os.path.join(self.state_dir, f"{epic_key}.json")
+
+    def load_state(self, epic_key: str) -> Optional[Dict]:
+        try:
+            with open(self._state_path(epic_key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable run state for epic %s: %s", epic_key, e)
+            return None
+
+    def check(self, epic_key: str, compare: bool = True) -> Optional[ChangeCheck]:
+        """
+        Return the epic's current fingerprint inputs and whether it changed; None if they can't be read.
+
+        With `compare=False` (forced runs) the inputs are collected for `record_run` but always reported as changed.
+        """
+        jira_updated = self.jira_client.get_epic_updated_timestamps(epic_key)
+        if not jira_updated:
+            logger.warning("Could not read Jira timestamps for epic %s; skipping change detection", epic_key)
+            return None
+        repos = self.github_client.get_org_repos(settings.GITHUB_REPO_PREFIX)
+        repo_heads = self.github_client.get_repo_heads(repos)
+
+        state = self.load_state(epic_key)
+        check = ChangeCheck(epic_key, jira_updated, repo_heads, changed=True)
+        if not compare or not state or not state.get("page_url") or "cards" not in state:
+            return check
+
+        if state.get("fingerprint") == check.fingerprint:
+            check.changed = False
+        elif state.get("jira_updated") == jira_updated and not self._has_new_card_commits(state, repo_heads):
+            logger.info("Repositories changed but no new commits for epic %s; refreshing fingerprint", epic_key)
+            check.changed = False
+            self.save_state(check, state["page_url"], state["cards"], state["commits"])
+
+        if not check.changed:
+            check.page_url = state["page_url"]
+        logger.info("Epic %s %s since last run", epic_key, "changed" if check.changed else "unchanged")
+        return check
+
+    def _has_new_card_commits(self, state: Dict, repo_heads: Dict[str, Optional[str]]) -> bool:
+        """Whether a repository that moved since the last run has commits for its cards that aren't on its page."""
+        card_keys = state["cards"]
+        old_heads = state.get("repo_heads") or {}
+        on_page = set(state.get("commits") or [])
+        for repo, head in repo_heads.items():
+            old_head = old_heads.get(repo)
+            if head == old_head:
+                continue
+            if head is None:
+                logger.info("Head of %s could not be read; assuming it has new commits", repo)
+                return True
+            commits = self.github_client.get_new_commits(repo, old_head, head) if old_head else None
+            if commits is None:
+                # No usable base (new or previously empty repository, rewritten history): look the cards up
+                commits = [c for key in card_keys for c in self.github_client.get_commits_with_card(repo, key)]
+            for commit in commits:
+                # Matched like the scan does, so anything the scan would pick up counts
+                if f"{repo}@{commit['sha'][:7]}" not in on_page and any(key in commit["message"] for key in card_keys):
+                    logger.info("New commit %s@%.7s for the cards of epic %s", repo, commit["sha"], state["epic"])
+                    return True
+        return False
+
+    def save_state(self, check: ChangeCheck, page_url: str, card_keys: List[str], commits: List[str]):
+        state = {
+            "epic": check.epic_key,
+            "fingerprint": check.fingerprint,
+            "jira_updated": check.jira_updated,
+            "repo_heads": check.repo_heads,
+            "cards": sorted(set(card_keys)),
+            "commits": sorted(set(commits)),
+            "page_url": page_url,
+            "saved_at": datetime.now().isoformat(),
+        }
+        atomic_write(self._state_path(check.epic_key), json.dumps(state, indent=2).encode("utf-8"))
+        logger.debug("Saved run state for epic %s", check.epic_key)
+
+    def record_run(self, check: ChangeCheck, page_url: str, card_keys: List[str], commits: List[str]):
+        """
+        Save the state of a run that published `page_url`.
+
+        `card_keys` and `commits` (`repo@sha`) are what the run scanned, and `check` holds the heads
+        read before the scan, so commits pushed while the run was in progress are still seen as new.
+        """
+        # Linking the page comments on the epic, which bumps its `updated`; take the new value so
+        # the run's own comment doesn't count as a change next time
+        updated = self.jira_client.get_epic_updated_timestamps(check.epic_key) or {}
+        if check.epic_key in updated:
+            check.jira_updated[check.epic_key] = updated[check.epic_key]
+        self.save_state(check, page_url, card_keys, commits)
@@ -0,0 +1,82 @@
+# services/workspace.py
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from common import get_logger
+import config.settings as settings
+
+logger = get_logger(__name__)
+
+# Workspaces of runs in progress in this process; never garbage-collected
+_active_run_ids = set()
+_active_lock = threading.Lock()
+
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class RunWorkspace:
+    """
+    Private working directory of a single pipeline run, keyed by run id.
+
+    Concurrent runs each get their own commit diffs directory and changelog file, so they never
+    overwrite each other's output. Use as a context manager to mark the workspace active while
+    the run is in progress.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, root: Optional[str] = None):
+        self.run_id = run_id or new_run_id()
+        self.root = Path(root or settings.WORKSPACES_DIR)
+        self.path = self.root / self.run_id
+        self.commit_diffs_dir = str(self.path / "commit_diffs")
+        self.changelog_file = str(self.path / os.path.basename(settings.CHANGELOG_OUTPUT_FILE))
+
+    def __enter__(self):
+        with _active_lock:
+            _active_run_ids.add(self.run_id)
+        os.makedirs(self.commit_diffs_dir, exist_ok=True)
+        logger.info("Using workspace %s for run %s", self.path, self.run_id)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with _active_lock:
+            _active_run_ids.discard(self.run_id)
+        # Refresh the mtime so the workspace is kept for a full TTL after the run ends
+        try:
+            os.utime(self.path)
+        except OSError:
+            pass
+
+    def remove(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+def cleanup_stale_workspaces(root: Optional[str] = None, max_age_seconds: Optional[float] = None) -> int:
+    """Delete workspaces not modified for `max_age_seconds`, skipping runs active in this process."""
+    root = Path(root or settings.WORKSPACES_DIR)
+    max_age_seconds = settings.WORKSPACE_TTL_SECONDS if max_age_seconds is None else max_age_seconds
+    if not root.is_dir():
+        return 0
+
+    cutoff = time.time() - max_age_seconds
+    with _active_lock:
+        active = set(_active_run_ids)
+    removed = 0
+    for entry in root.iterdir():
+        try:
+            if not entry.is_dir() or entry.name in active or entry.stat().st_mtime >= cutoff:
+                continue
+        except OSError:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        removed += 1
+        logger.debug("Removed stale workspace: %s", entry)
+    if removed:
+        logger.info("Garbage-collected %d stale workspaces from %s", removed, root)
+    return removed
@@ -1,6 +1,10 @@
 # summarize_ai/__init__.py
-from .epic import Epic
-from .card import Card
+# Order matters: each module imports its dependencies from this package.
+from .llm_executor import LLMExecutor, LLMRateLimiter
 from .commit import Commit
+from .commit_ranker import select_commits
+from .card import Card
+from .epic import Epic
+from .dedup import deduplicate_commits, DedupReport
 from .change_log_generator import ChangeLogGenerator
 # prompts.py is usually not part of the public API
@@ -1,8 +1,9 @@
-from typing import List
+from typing import List, Optional
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import HumanMessage
 
 from summarize_ai import Commit # Updated import
+from summarize_ai.commit_ranker import select_commits
 from summarize_ai.prompts import CARD_SUMMARY_TEMPLATE
 from common import get_logger # Updated import
 
@@ -11,18 +12,32 @@ logger = get_logger(__name__)
 
 
 class Card:
-    def __init__(self, card_id: str, title: str, description: str, commits: List[Commit]):
+    def __init__(self, card_id: str, title: str, description: str, commits: List[Commit],
+                 max_commits: Optional[int] = None, char_budget: Optional[int] = None):
         self.id = card_id
         self.title = title
         self.description = description
         self.commits = commits
+        # Per-card budget: at most `max_commits` individually summarized commits totalling `char_budget` diff chars;
+        # None uses settings.CARD_MAX_COMMITS / settings.CARD_DIFF_CHAR_BUDGET
+        self.max_commits = max_commits
+        self.char_budget = char_budget
 
     def summarize(self, llm: ChatOpenAI) -> str:
-        commit_summaries = [commit.summarize(llm) for commit in self.commits]
+        # A duplicate whose original is on this card would only repeat the same summary,
+        # unless it re-applies a reverted change
+        commits = [c for c in self.commits if c.duplicate_of not in self.commits or c.reapplies_after is not None]
+        selection = select_commits(commits, self.max_commits, self.char_budget)
+        logger.info("Card %s: summarizing %d of %d commits (%d in digest, %d merges skipped)",
+                    self.id, len(selection.selected), len(commits), selection.digested, selection.merges_skipped)
+
+        commit_summaries = [commit.summarize(llm) for commit in selection.selected]
         joined = "\n\n".join([
             f"- Repo: {c.repo}, SHA: {c.sha}\n{summary}"
-            for c, summary in zip(self.commits, commit_summaries)
+            for c, summary in zip(selection.selected, commit_summaries)
         ])
+        if selection.digest:
+            joined += f"\n\nOther minor commits (not individually summarized):\n{selection.digest}"
         prompt = CARD_SUMMARY_TEMPLATE.format(
             card_title=self.title,
             card_description=self.description,
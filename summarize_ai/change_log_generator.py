@@ -1,3 +1,5 @@
+from typing import Optional
+
 from langchain_community.chat_models import ChatOpenAI
 from summarize_ai import Epic # Updated import
 
@@ -11,21 +13,24 @@ class ChangeLogGenerator:
     def __init__(self, llm: ChatOpenAI):
         logger.debug("Initializing ChangeLogGenerator")
         self.llm = llm
-        logger.debug(f"ChangeLogGenerator initialized with LLM: {type(llm).__name__}")
+        logger.debug("ChangeLogGenerator initialized with LLM: %s", type(llm).__name__)
 
-    def generate(self, epic: Epic, output_path: str):
-        logger.info(f"Generating changelog for epic: {epic.id} - {epic.title}")
-        logger.debug(f"Epic contains {len(epic.cards)} cards")
+    def generate(self, epic: Epic, output_path: Optional[str] = None) -> str:
+        """Summarize the epic and return the changelog; it is also written to `output_path` if given."""
+        logger.info("Generating changelog for epic: %s - %s", epic.id, epic.title)
+        logger.debug("Epic contains %s cards", len(epic.cards))
 
         logger.info("Summarizing epic with LLM")
         summary = epic.summarize(self.llm)
-        logger.debug(f"Generated summary of length: {len(summary)} characters")
-
-        logger.info(f"Writing changelog to: {output_path}")
-        try:
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(summary)
-            logger.info(f"Changelog successfully saved to: {output_path}")
-        except Exception as e:
-            logger.error(f"Error saving changelog to {output_path}: {e}")
-            raise
+        logger.debug("Generated summary of length: %s characters", len(summary))
+
+        if output_path:
+            logger.info("Writing changelog to: %s", output_path)
+            try:
+                with open(output_path, "w", encoding="utf-8") as f:
+                    f.write(summary)
+                logger.info("Changelog successfully saved to: %s", output_path)
+            except Exception as e:
+                logger.error("Error saving changelog to %s: %s", output_path, e)
+                raise
+        return summary
@@ -1,15 +1,35 @@
+from typing import Optional
+
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import HumanMessage
 from summarize_ai.prompts import COMMIT_SUMMARY_TEMPLATE
 
 
 class Commit:
-    def __init__(self, repo: str, sha: str, diff: str):
+    def __init__(self, repo: str, sha: str, diff: str, message: str = "", date: str = ""):
         self.repo = repo
         self.sha = sha
         self.diff = diff
+        self.message = message
+        self.date = date
+        # Set by summarize_ai.dedup.deduplicate_commits
+        self.patch_id: Optional[str] = None
+        self.duplicate_of: Optional["Commit"] = None
+        self.reverts: Optional["Commit"] = None
+        self.reapplies_after: Optional["Commit"] = None
+        self._summary: Optional[str] = None
 
     def summarize(self, llm: ChatOpenAI, max_chars=3000) -> str:
-        truncated_diff = self.diff[:max_chars]
-        prompt = COMMIT_SUMMARY_TEMPLATE.format(diff=truncated_diff)
-        return llm([HumanMessage(content=prompt)]).content
\ No newline at end of file
+        if self.duplicate_of is not None:
+            summary = self.duplicate_of.summarize(llm, max_chars)
+            if self.reapplies_after is not None:
+                return (f"Re-applies {self.duplicate_of.sha} after revert {self.reapplies_after.sha}; "
+                        f"the change is live again.\n{summary}")
+            return summary
+        if self.reverts is not None:
+            return f"Reverts commit {self.reverts.sha} in {self.reverts.repo}; no new changes."
+        if self._summary is None:
+            truncated_diff = self.diff[:max_chars]
+            prompt = COMMIT_SUMMARY_TEMPLATE.format(diff=truncated_diff)
+            self._summary = llm([HumanMessage(content=prompt)]).content
+        return self._summary
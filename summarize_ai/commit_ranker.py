@@ -0,0 +1,165 @@
+import math
+import re
+from typing import List, Optional
+
+from summarize_ai import Commit
+from common import get_logger
+import config.settings as settings
+
+# Initialize logger
+logger = get_logger(__name__)
+
+MAX_DIGEST_LINES = 50
+
+FILE_HEADER = re.compile(r"^diff --git a/(.*) b/(.*)$")
+TEST_PATH = re.compile(r"(^|/)(tests?|spec|__tests__|testdata|fixtures)/|(_test|_spec|\.test|\.spec|Test|Tests|IT)\.\w+$|(^|/)test_[^/]*$")
+CONFIG_PATH = re.compile(r"\.(ya?ml|json|properties|toml|ini|cfg|conf|xml|env|gradle)$|(^|/)(Dockerfile|Makefile|Jenkinsfile)$")
+IGNORED_PATH = re.compile(r"(^|/)(package-lock\.json|yarn\.lock|pnpm-lock\.yaml|poetry\.lock|Pipfile\.lock|go\.sum|Cargo\.lock)$|\.(md|rst|txt|svg|png|jpg|gif|snap|min\.js|map)$")
+API_PATTERN = re.compile(
+    r"@(Get|Post|Put|Delete|Patch|Request)Mapping|@(GET|POST|PUT|DELETE|PATCH|Path)\b|@\w+\.route\(|"
+    r"@(app|router|api|bp|blueprint)\.(get|post|put|delete|patch)\(|\b(app|router|api)\.(get|post|put|delete|patch)\(\s*['\"]|"
+    r"\b(path|re_path|url)\(\s*r?['\"]|^\s*/[\w/{}:-]+:\s*$"
+)
+TOGGLE_PATTERN = re.compile(
+    r"feature[_\-\s]?(flag|toggle)|\btoggles?\b|launchdarkly|unleash|flipper|is_?enabled\(|isFeatureEnabled|\bFF_[A-Z0-9_]+",
+    re.IGNORECASE,
+)
+TRIVIAL_MESSAGE = re.compile(
+    r"^(wip|fixup!|squash!|tmp|temp|typo|format(ting)?|lint(ing)?|style|nit|pr comments?|review comments?)\b",
+    re.IGNORECASE,
+)
+MERGE_MESSAGE = re.compile(r"^Merge (pull request|branch|remote-tracking branch|.* into )", re.IGNORECASE)
+
+
+class CommitScore:
+    def __init__(self, commit: Commit):
+        self.commit = commit
+        self.files: List[str] = []
+        self.source_lines = 0
+        self.test_lines = 0
+        self.config_lines = 0
+        self.api_changes: List[str] = []
+        self.toggle_changes: List[str] = []
+        self._analyze(commit.diff or "")
+        self.message_quality = self._message_quality(commit.message or "")
+        weighted = self.source_lines + 0.5 * self.config_lines + 0.2 * self.test_lines
+        self.weighted_lines = weighted
+        self.score = (10 * math.log1p(weighted) + self.message_quality
+                      + 25 * bool(self.api_changes) + 25 * bool(self.toggle_changes))
+
+    def _analyze(self, diff: str):
+        path = None
+        for line in diff.splitlines():
+            header = FILE_HEADER.match(line)
+            if header:
+                path = header.group(2)
+                self.files.append(path)
+                continue
+            if path is None or line.startswith(("---", "+++")) or not line.startswith(("+", "-")):
+                continue
+            text = line[1:].strip()
+            if not text or IGNORED_PATH.search(path):
+                continue
+            if TEST_PATH.search(path):
+                self.test_lines += 1
+                continue
+            if CONFIG_PATH.search(path):
+                self.config_lines += 1
+            else:
+                self.source_lines += 1
+            if API_PATTERN.search(text) and len(self.api_changes) < 3:
+                self.api_changes.append(text[:80])
+            if TOGGLE_PATTERN.search(text) and len(self.toggle_changes) < 3:
+                self.toggle_changes.append(text[:80])
+
+    @staticmethod
+    def _message_quality(message: str) -> float:
+        subject = message.strip().splitlines()[0] if message.strip() else ""
+        # Card keys are stripped so "ABC-123 wip" counts as a WIP commit
+        subject = re.sub(r"^\W*[A-Z][A-Z0-9]+-\d+\W*", "", subject)
+        if TRIVIAL_MESSAGE.match(subject) or len(subject) < 10:
+            return -10.0
+        quality = min(len(subject), 60) / 6
+        if len(message.strip().splitlines()) > 2:
+            quality += 4
+        return quality
+
+    @property
+    def has_signals(self) -> bool:
+        return bool(self.api_changes or self.toggle_changes)
+
+    @property
+    def is_trivial(self) -> bool:
+        if self.has_signals:
+            return False
+        # Test/doc-only changes and small, poorly described commits go to the digest
+        return (self.weighted_lines <= 3 or self.source_lines + self.config_lines == 0 or
+                (self.message_quality < 0 and self.weighted_lines < 20))
+
+    def digest_line(self) -> str:
+        subject = (self.commit.message or "").strip().splitlines()[0] if (self.commit.message or "").strip() else "(no message)"
+        files = ", ".join(self.files[:3]) + (f" and {len(self.files) - 3} more" if len(self.files) > 3 else "")
+        line = f"- {self.commit.repo}@{self.commit.sha}: {subject} [{files or 'no files'}; {self.source_lines} source lines]"
+        if self.api_changes:
+            line += f"; API: {' | '.join(self.api_changes)}"
+        if self.toggle_changes:
+            line += f"; toggles: {' | '.join(self.toggle_changes)}"
+        return line
+
+
+class CommitSelection:
+    def __init__(self, selected: List[Commit], digest: str, merges_skipped: int, digested: int):
+        self.selected = selected
+        self.digest = digest
+        self.merges_skipped = merges_skipped
+        self.digested = digested
+
+
+def select_commits(commits: List[Commit], max_commits: Optional[int] = None,
+                   char_budget: Optional[int] = None, max_chars: int = 3000) -> CommitSelection:
+    """
+    Pick the commits of a card worth an individual LLM summary, without calling the LLM.
+
+    Merge commits are skipped. Commits are ranked by changed source lines, detected API route and
+    toggle changes, and message quality; the top `max_commits` that fit in `char_budget` diff
+    characters are selected (API/toggle commits first) and everything else is folded into a
+    one-line-per-commit digest, so per-card cost is bounded regardless of commit count.
+    Cards that already fit within both limits are summarized in full. The limits default to
+    settings.CARD_MAX_COMMITS and settings.CARD_DIFF_CHAR_BUDGET.
+    """
+    max_commits = settings.CARD_MAX_COMMITS if max_commits is None else max_commits
+    char_budget = settings.CARD_DIFF_CHAR_BUDGET if char_budget is None else char_budget
+    merges = [c for c in commits if MERGE_MESSAGE.match((c.message or "").strip())]
+    scores = [CommitScore(c) for c in commits if not MERGE_MESSAGE.match((c.message or "").strip())]
+
+    # Reverts and re-applies are noted without an LLM call, so they are always kept
+    selected_ids = {id(s.commit) for s in scores
+                    if s.commit.reverts is not None or s.commit.reapplies_after is not None}
+    candidates = [s for s in scores if id(s.commit) not in selected_ids]
+    total_chars = sum(min(len(s.commit.diff or ""), max_chars) for s in candidates)
+    if len(candidates) > max_commits or total_chars > char_budget:
+        # Trivial commits only go to the digest when the card is over its limits
+        candidates = [s for s in candidates if not s.is_trivial]
+    candidates.sort(key=lambda s: (s.has_signals, s.score), reverse=True)
+
+    used_chars = 0
+    picked = 0
+    for s in candidates:
+        cost = min(len(s.commit.diff or ""), max_chars)
+        if picked >= max_commits:
+            break
+        if used_chars + cost > char_budget:
+            continue
+        selected_ids.add(id(s.commit))
+        used_chars += cost
+        picked += 1
+
+    rest = sorted((s for s in scores if id(s.commit) not in selected_ids), key=lambda s: s.score, reverse=True)
+    lines = [s.digest_line() for s in rest[:MAX_DIGEST_LINES]]
+    if len(rest) > MAX_DIGEST_LINES:
+        lines.append(f"- ... and {len(rest) - MAX_DIGEST_LINES} more minor commits")
+
+    selected = [c for c in commits if id(c) in selected_ids]
+    logger.debug("Selected %d of %d commits (%d merges skipped, %d digested, %d diff chars)",
+                 len(selected), len(commits), len(merges), len(rest), used_chars)
+    return CommitSelection(selected, "\n".join(lines), len(merges), len(rest))
@@ -0,0 +1,133 @@
+import hashlib
+import re
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from summarize_ai import Commit
+from summarize_ai.llm_executor import estimate_tokens
+from summarize_ai.prompts import COMMIT_SUMMARY_TEMPLATE
+from common import get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+FILE_HEADER = re.compile(r"^diff --git a/(.*) b/(.*)$")
+WHITESPACE = re.compile(r"\s+")
+EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _file_changes(diff: str) -> List[Tuple[str, List[str], List[str]]]:
+    """Split a unified diff into (path, removed lines, added lines), ignoring whitespace and line numbers."""
+    files = []
+    current = None
+    for line in diff.splitlines():
+        header = FILE_HEADER.match(line)
+        if header:
+            current = (header.group(2), [], [])
+            files.append(current)
+            continue
+        if current is None or line.startswith(("---", "+++", "@@", "index ")):
+            continue
+        if line.startswith(("+", "-")):
+            text = WHITESPACE.sub("", line[1:])
+            if text:
+                (current[2] if line[0] == "+" else current[1]).append(text)
+    return [f for f in files if f[1] or f[2]]
+
+
+def _hash_files(files: List[Tuple[str, List[str], List[str]]]) -> str:
+    # Per-file hashes are sorted so the fingerprint does not depend on file order (like `git patch-id --stable`).
+    file_hashes = sorted(
+        hashlib.sha1("\0".join([path, *("-" + l for l in removed), *("+" + l for l in added)]).encode()).hexdigest()
+        for path, removed, added in files
+    )
+    return hashlib.sha1("".join(file_hashes).encode()).hexdigest()
+
+
+def compute_patch_ids(diff: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Fingerprint a diff by its normalized patch content.
+
+    Returns (patch_id, reverse_patch_id); the reverse id is the patch id the diff's revert would have.
+    Both are None when the diff holds no changed lines (e.g. a failed fetch).
+    """
+    files = _file_changes(diff or "")
+    if not files:
+        return None, None
+    reverse = [(path, added, removed) for path, removed, added in files]
+    return _hash_files(files), _hash_files(reverse)
+
+
+def _commit_time(commit: Commit) -> datetime:
+    # Dates come with mixed UTC offsets (REST "Z", git "%aI" "+02:00"), so compare them as instants
+    try:
+        parsed = datetime.fromisoformat((commit.date or "").replace("Z", "+00:00"))
+    except ValueError:
+        return EPOCH
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class DedupReport:
+    def __init__(self):
+        self.commits = 0
+        self.duplicates = 0
+        self.reverts = 0
+        self.reapplies = 0
+        self.tokens_saved = 0
+
+    @property
+    def llm_calls_saved(self) -> int:
+        return self.duplicates + self.reverts
+
+    def __str__(self) -> str:
+        return (f"{self.commits} commits, {self.duplicates} duplicates ({self.reapplies} re-applies), {self.reverts} reverts; "
+                f"saved {self.llm_calls_saved} LLM calls (~{self.tokens_saved} tokens)")
+
+
+def deduplicate_commits(commits: List[Commit], max_chars: int = 3000) -> DedupReport:
+    """
+    Collapse commits carrying the same patch so each distinct change is summarized once.
+
+    Duplicates (cherry-picks, re-applies, cards sharing a commit) get `duplicate_of` set to the
+    earliest commit with that patch and reuse its summary. A commit whose patch is the inverse of
+    an earlier one gets `reverts` set and is noted instead of summarized. A duplicate of a change
+    that was reverted in between also gets `reapplies_after` set to that revert, so the change is
+    reported as live again rather than collapsed into the reverted original.
+    """
+    report = DedupReport()
+    report.commits = len(commits)
+    first_seen = {}
+    latest_seen = {}
+    # patch id -> the revert that currently undoes it
+    reverted_by = {}
+
+    for commit in sorted(commits, key=_commit_time):
+        patch_id, reverse_id = compute_patch_ids(commit.diff)
+        commit.patch_id = patch_id
+        if patch_id is None:
+            continue
+
+        if patch_id in first_seen:
+            commit.duplicate_of = first_seen[patch_id]
+            report.duplicates += 1
+            if patch_id in reverted_by:
+                commit.reapplies_after = reverted_by.pop(patch_id)
+                report.reapplies += 1
+                logger.debug("Commit %s@%s re-applies %s after revert %s", commit.repo, commit.sha,
+                             commit.duplicate_of.sha, commit.reapplies_after.sha)
+            logger.debug("Commit %s@%s duplicates %s@%s", commit.repo, commit.sha, commit.duplicate_of.repo, commit.duplicate_of.sha)
+        elif reverse_id in latest_seen:
+            commit.reverts = latest_seen[reverse_id]
+            reverted_by[reverse_id] = commit
+            report.reverts += 1
+            logger.debug("Commit %s@%s reverts %s@%s", commit.repo, commit.sha, commit.reverts.repo, commit.reverts.sha)
+        else:
+            first_seen[patch_id] = commit
+        latest_seen[patch_id] = commit
+
+        if commit.duplicate_of is not None or commit.reverts is not None:
+            prompt = COMMIT_SUMMARY_TEMPLATE.format(diff=commit.diff[:max_chars])
+            report.tokens_saved += estimate_tokens([prompt])
+
+    logger.info("Commit deduplication: %s", report)
+    return report
@@ -12,20 +12,20 @@ logger = get_logger(__name__)
 
 class Epic:
     def __init__(self, epic_id: str, title: str, description: str, cards: List[Card]):
-        logger.debug(f"Initializing Epic: {epic_id} - {title}")
+        logger.debug("Initializing Epic: %s - %s", epic_id, title)
         self.id = epic_id
         self.title = title
         self.description = description
         self.cards = cards
-        logger.debug(f"Epic initialized with {len(cards)} cards")
+        logger.debug("Epic initialized with %s cards", len(cards))
 
     def summarize(self, llm) -> str:
-        logger.info(f"Summarizing Epic: {self.id} - {self.title}")
+        logger.info("Summarizing Epic: %s - %s", self.id, self.title)
 
-        logger.debug(f"Generating summaries for {len(self.cards)} cards")
+        logger.debug("Generating summaries for %s cards", len(self.cards))
         card_summaries = []
         for i, card in enumerate(self.cards):
-            logger.debug(f"Summarizing card {i+1}/{len(self.cards)}: {card.id}")
+            logger.debug("Summarizing card %s/%s: %s", i+1, len(self.cards), card.id)
             card_summary = card.summarize(llm)
             card_summaries.append(card_summary)
 
@@ -45,10 +45,10 @@ class Epic:
         logger.info("Generating epic summary with LLM")
         try:
             epic_summary = llm([HumanMessage(content=prompt)]).content
-            logger.debug(f"Generated epic summary of length: {len(epic_summary)} characters")
+            logger.debug("Generated epic summary of length: %s characters", len(epic_summary))
 
             logger.info("Epic summarization completed successfully")
             return epic_summary
         except Exception as e:
-            logger.error(f"Error generating epic summary: {e}")
+            logger.error("Error generating epic summary: %s", e)
             raise
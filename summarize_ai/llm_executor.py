@@ -0,0 +1,322 @@
+import random
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Callable, List, Optional
+
+from common import ContextThreadPoolExecutor, get_logger
+
+# Initialize logger
+logger = get_logger(__name__)
+
+# Rough chars-per-token ratio used to budget prompts before they are sent.
+CHARS_PER_TOKEN = 4
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Status codes are matched as whole words so numbers like "15000 tokens" don't count
+RATE_LIMIT_PATTERN = re.compile(r"\b429\b|resource_?exhausted|rate limit|quota", re.IGNORECASE)
+TRANSIENT_PATTERN = re.compile(r"\b50[03]\b|unavailable|deadline_?exceeded|internalservererror|"
+                               r"timed out|timeout|connection reset", re.IGNORECASE)
+
+RETRY_HINT_PATTERNS = (
+    re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE),
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)", re.IGNORECASE),
+    re.compile(r"retry-after:?\s*([\d.]+)", re.IGNORECASE),
+)
+
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when an LLM call (including any hedged attempt) exceeds its timeout."""
+
+
+def estimate_tokens(messages: List) -> int:
+    """Estimate the prompt token count of a list of chat messages."""
+    chars = sum(len(getattr(message, "content", message) or "") for message in messages)
+    return max(1, chars // CHARS_PER_TOKEN)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.capacity = float(rate_per_minute)
+        self.rate_per_minute = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate_per_minute / 60.0)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Block until `amount` tokens are available, consume them and return the time waited."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now >= self._blocked_until and self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                else:
+                    delay = (amount - self.tokens) * 60.0 / self.rate_per_minute
+            self._sleep(delay)
+            waited += delay
+
+    def try_acquire(self, amount: float = 1.0) -> bool:
+        """Consume `amount` tokens if they are available right now; never blocks."""
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if now >= self._blocked_until and self.tokens >= amount:
+                self.tokens -= amount
+                return True
+            return False
+
+    def release(self, amount: float = 1.0):
+        """Return tokens taken by an acquire that ended up unused."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + float(amount))
+
+    def block_for(self, seconds: float):
+        """Stop handing out tokens for `seconds`, e.g. after a server-side rate limit."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def set_rate(self, rate_per_minute: float):
+        with self._lock:
+            self._refill(self._clock())
+            self.rate_per_minute = float(rate_per_minute)
+
+
+class LLMRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limiter shared by every LLM call in the process.
+
+    The effective request rate adapts to the server: it is halved whenever a call is rate
+    limited and recovers gradually on success, never exceeding the configured limit.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float,
+                 min_requests_per_minute: float = 1.0, recovery_step: float = 0.05,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        logger.debug("Initializing LLMRateLimiter: %s RPM, %s TPM", requests_per_minute, tokens_per_minute)
+        self.requests_per_minute = float(requests_per_minute)
+        self.min_requests_per_minute = min(float(min_requests_per_minute), self.requests_per_minute)
+        self.recovery_step = recovery_step
+        self.requests = TokenBucket(requests_per_minute, clock=clock, sleep=sleep)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock, sleep=sleep)
+        self._lock = threading.Lock()
+
+    @property
+    def current_requests_per_minute(self) -> float:
+        return self.requests.rate_per_minute
+
+    def acquire(self, tokens: int) -> float:
+        """Wait for one request slot and `tokens` prompt tokens; return the total time waited."""
+        waited = self.requests.acquire(1)
+        waited += self.tokens.acquire(tokens)
+        if waited > 0:
+            logger.debug("LLM rate limiter delayed call by %.2fs", waited)
+        return waited
+
+    def try_acquire(self, tokens: int) -> bool:
+        """Take one request slot and `tokens` prompt tokens only if both are available right now."""
+        if not self.requests.try_acquire(1):
+            return False
+        if not self.tokens.try_acquire(tokens):
+            self.requests.release(1)
+            return False
+        return True
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        with self._lock:
+            new_rate = max(self.min_requests_per_minute, self.requests.rate_per_minute / 2)
+            self.requests.set_rate(new_rate)
+        if retry_after:
+            self.requests.block_for(retry_after)
+            logger.warning("LLM rate limited; throttling to %.1f RPM and pausing %.1fs", new_rate, retry_after)
+        else:
+            logger.warning("LLM rate limited; throttling to %.1f RPM", new_rate)
+
+    def on_success(self):
+        with self._lock:
+            current = self.requests.rate_per_minute
+            if current < self.requests_per_minute:
+                step = self.requests_per_minute * self.recovery_step
+                self.requests.set_rate(min(self.requests_per_minute, current + step))
+
+
+def get_status_code(exc: BaseException) -> Optional[int]:
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if callable(value):
+            try:
+                value = value()
+            except Exception:
+                value = None
+        if isinstance(value, int):
+            return value
+        value = getattr(value, "value", value)  # grpc StatusCode enums
+        if isinstance(value, tuple) and value and isinstance(value[0], int):
+            return {8: 429, 14: 503, 4: 504}.get(value[0])
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    if get_status_code(exc) == 429:
+        return True
+    return bool(RATE_LIMIT_PATTERN.search(f"{type(exc).__name__} {exc}"))
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    if get_status_code(exc) in RETRYABLE_STATUS_CODES or is_rate_limit_error(exc):
+        return True
+    return bool(TRANSIENT_PATTERN.search(f"{type(exc).__name__} {exc}"))
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """Extract a server-provided retry delay (in seconds) from an exception, if any."""
+    retry_after = getattr(exc, "retry_after", None)
+    if isinstance(retry_after, (int, float)):
+        return float(retry_after)
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        header = headers.get("Retry-After") or headers.get("retry-after")
+        if header is not None:
+            return float(header)
+    except (TypeError, ValueError, AttributeError):
+        pass
+    text = str(exc)
+    for pattern in RETRY_HINT_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+class LLMExecutor:
+    """
+    Execution layer wrapping any LangChain chat model.
+
+    Every call goes through the shared rate limiter, is bounded by a per-call timeout, is
+    hedged with a second attempt when it is slower than `hedge_after`, and is retried with
+    jittered exponential backoff (honoring server retry hints) on transient failures.
+    The executor is callable like the chat model, so `Commit`, `Card` and `Epic` use it as-is.
+    """
+
+    def __init__(self, llm, rate_limiter: Optional[LLMRateLimiter] = None, timeout: Optional[float] = 120.0,
+                 max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 60.0,
+                 hedge_after: Optional[float] = None, max_workers: int = 8,
+                 sleep: Callable[[float], None] = time.sleep):
+        logger.debug("Initializing LLMExecutor for model: %s", type(llm).__name__)
+        self.llm = llm
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after if hedge_after and (timeout is None or hedge_after < timeout) else None
+        self._sleep = sleep
+        # Timed-out calls cannot be interrupted, so they run on pool threads the caller stops waiting for.
+        self._pool = ContextThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-call")
+
+    def __call__(self, messages: List):
+        return self.invoke(messages)
+
+    def invoke(self, messages: List):
+        tokens = estimate_tokens(messages)
+        attempt = 0
+        while True:
+            try:
+                result = self._attempt(messages, tokens)
+                if self.rate_limiter:
+                    self.rate_limiter.on_success()
+                return result
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    logger.error("LLM call failed after %s attempt(s): %s", attempt + 1, e)
+                    raise
+                retry_after = get_retry_after(e)
+                if is_rate_limit_error(e) and self.rate_limiter:
+                    self.rate_limiter.on_rate_limited(retry_after)
+                delay = self._backoff_delay(attempt, retry_after)
+                attempt += 1
+                logger.warning("LLM call failed (%s: %s); retry %d/%d in %.2fs",
+                               type(e).__name__, e, attempt, self.max_retries, delay)
+                self._sleep(delay)
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        # Full jitter keeps concurrent workers from retrying in lockstep.
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after + random.uniform(0, self.base_delay))
+        return delay
+
+    def _submit(self, messages: List, tokens: int):
+        if self.rate_limiter:
+            self.rate_limiter.acquire(tokens)
+        return self._pool.submit(self.llm.invoke, messages)
+
+    def _submit_hedge(self, messages: List, tokens: int):
+        # A hedge is optional: skip it rather than stall the wait loop on a throttled limiter
+        if self.rate_limiter and not self.rate_limiter.try_acquire(tokens):
+            logger.info("LLM call slower than %ss; rate limiter has no capacity, not hedging", self.hedge_after)
+            return None
+        logger.info("LLM call slower than %ss; sending hedged request", self.hedge_after)
+        return self._pool.submit(self.llm.invoke, messages)
+
+    def _attempt(self, messages: List, tokens: int):
+        futures = [self._submit(messages, tokens)]
+        # Clocks start once the request slot is acquired, so time queued in the limiter isn't charged to the call
+        start = time.monotonic()
+        deadline = start + self.timeout if self.timeout else None
+        hedge_at = start + self.hedge_after if self.hedge_after else None
+        last_error = None
+
+        while futures:
+            now = time.monotonic()
+            waits = [t - now for t in (deadline, hedge_at) if t is not None]
+            done, pending = wait(futures, timeout=max(0.0, min(waits)) if waits else None,
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                last_error = error
+            futures = list(pending)
+
+            now = time.monotonic()
+            if deadline is not None and now >= deadline and futures:
+                for future in futures:
+                    future.cancel()
+                raise LLMTimeoutError(f"LLM call exceeded timeout of {self.timeout}s")
+            if hedge_at is not None and now >= hedge_at and futures:
+                hedge_at = None
+                hedge = self._submit_hedge(messages, tokens)
+                if hedge is not None:
+                    futures.append(hedge)
+
+        raise last_error
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Keep test runs from writing autodoc.log into the working tree
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.gettempdir(), "autodoc-tests.log"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
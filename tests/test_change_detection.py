@@ -0,0 +1,161 @@
+import main
+import config.settings as settings
+from common import log_context
+
+DIFF = "diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n@@ -1 +1 @@\n-x = 1\n+x = 2\n"
+
+
+class FakeJira:
+    def __init__(self):
+        self.updated = {"EPIC-1": "2024-01-01T00:00:00.000+0000", "ABC-1": "2024-01-01T00:00:00.000+0000"}
+
+    def get_epic_updated_timestamps(self, epic_key):
+        return dict(self.updated)
+
+    def get_epic_data(self, epic_key):
+        return {"id": epic_key, "title": "Epic", "description": "Epic description"}
+
+    def get_issues_linked_to_epic(self, epic_key):
+        return ["ABC-1"]
+
+    def get_card_data(self, card_key):
+        return {"id": card_key, "title": "Card", "description": "Card description"}
+
+
+class FakeGitHub:
+    """Default-branch history per repository; heads are the latest commit's sha."""
+
+    def __init__(self):
+        self.history = {"service-a": [], "service-b": [], "service-empty": []}
+        self.card_lookups = 0
+        self.push("service-a", "ABC-1 Change x")
+        self.push("service-b", "Unrelated change")
+
+    def push(self, repo, message):
+        sha = f"{len(self.history[repo]) + 1:x}{repo}".ljust(40, "0")
+        self.history[repo].append({"sha": sha, "message": message, "date": "2024-01-01T00:00:00Z"})
+        return sha
+
+    def get_org_repos(self, prefix=""):
+        return sorted(self.history)
+
+    def get_repo_heads(self, repos):
+        # Like commits/HEAD on an empty repository (HTTP 409), an empty one has no readable head
+        return {repo: self.history[repo][-1]["sha"] if self.history[repo] else None for repo in repos}
+
+    def get_new_commits(self, repo, base, head):
+        shas = [c["sha"] for c in self.history[repo]]
+        if base not in shas:
+            return None
+        return [{"repo": repo, **c} for c in self.history[repo][shas.index(base) + 1:]]
+
+    def get_commits_with_card(self, repo, card_number):
+        self.card_lookups += 1
+        return [{"repo": repo, **c} for c in self.history[repo] if card_number in c["message"]]
+
+    def get_commit_diff(self, repo, sha):
+        return DIFF
+
+
+class FakeModel:
+    calls = 0
+
+    def invoke(self, messages):
+        FakeModel.calls += 1
+        return type("Response", (), {"content": "summary"})()
+
+
+def setup_pipeline(monkeypatch, tmp_path):
+    jira, github = FakeJira(), FakeGitHub()
+    pages = []
+    during_run = []
+
+    def add_comment(page_url, epic_key):
+        # Commenting on the epic bumps its `updated` timestamp in Jira
+        jira.updated[epic_key] = f"2024-01-0{len(pages) + 1}T12:00:00.000+0000"
+
+    def create_confluence_page(title, html):
+        pages.append(title)
+        while during_run:
+            during_run.pop()()
+        return f"https://wiki.example.com/pages/{len(pages)}"
+
+    monkeypatch.setattr(settings, "RUN_STATE_DIR", str(tmp_path / "state"))
+    monkeypatch.setattr(settings, "WORKSPACES_DIR", str(tmp_path / "workspaces"))
+    monkeypatch.setattr(settings, "GITHUB_REPO_PREFIX", "service")
+    monkeypatch.setattr(main, "create_clients", lambda: (jira, github))
+    monkeypatch.setattr(main, "ChatGoogleGenerativeAI", lambda **kwargs: FakeModel())
+    monkeypatch.setattr(main, "create_confluence_page", create_confluence_page)
+    monkeypatch.setattr(main, "add_comment", add_comment)
+    return jira, github, pages, during_run
+
+
+def run(epic_key, force=False):
+    # Like run_job, so the stages main() sets don't leak into other tests
+    with log_context(run_id="test", epic=epic_key):
+        return main.main(epic_key, force=force)
+
+
+def test_second_run_is_skipped(monkeypatch, tmp_path):
+    jira, github, pages, _ = setup_pipeline(monkeypatch, tmp_path)
+
+    assert run("EPIC-1").startswith("✅ Confluence page created: https://wiki.example.com/pages/1")
+    calls = FakeModel.calls
+    assert run("EPIC-1") == "✅ No changes since last run. Confluence page: https://wiki.example.com/pages/1"
+    assert FakeModel.calls == calls and len(pages) == 1
+
+    # A push without commits for the epic's cards only refreshes the fingerprint, without card lookups
+    github.push("service-b", "Another unrelated change")
+    lookups = github.card_lookups
+    assert run("EPIC-1").startswith("✅ No changes")
+    assert github.card_lookups == lookups
+    assert run("EPIC-1").startswith("✅ No changes")
+
+    # A new commit for a card, or a card edit, regenerates the page
+    github.push("service-b", "ABC-1 Change y")
+    assert run("EPIC-1").startswith("✅ Confluence page created: https://wiki.example.com/pages/2")
+    jira.updated["ABC-1"] = "2024-02-01T00:00:00.000+0000"
+    assert run("EPIC-1").startswith("✅ Confluence page created: https://wiki.example.com/pages/3")
+    assert run("EPIC-1").startswith("✅ No changes")
+
+
+def test_commit_pushed_during_run_is_picked_up(monkeypatch, tmp_path):
+    jira, github, pages, during_run = setup_pipeline(monkeypatch, tmp_path)
+
+    during_run.append(lambda: github.push("service-a", "ABC-1 Late change"))
+    run("EPIC-1")
+    assert run("EPIC-1").startswith("✅ Confluence page created: https://wiki.example.com/pages/2")
+    assert run("EPIC-1").startswith("✅ No changes")
+
+
+def test_first_commit_in_empty_repository(monkeypatch, tmp_path):
+    jira, github, pages, _ = setup_pipeline(monkeypatch, tmp_path)
+
+    run("EPIC-1")
+    github.push("service-empty", "Initial commit")
+    assert run("EPIC-1").startswith("✅ No changes")
+    github.push("service-empty", "ABC-1 Port x")
+    assert run("EPIC-1").startswith("✅ Confluence page created")
+
+
+def test_forced_run_regenerates_page(monkeypatch, tmp_path):
+    jira, github, pages, _ = setup_pipeline(monkeypatch, tmp_path)
+
+    run("EPIC-1")
+    assert run("EPIC-1", force=True).startswith("✅ Confluence page created")
+    assert run("EPIC-1").startswith("✅ No changes")
+    assert len(pages) == 2
+
+
+def test_failed_card_is_retried(monkeypatch, tmp_path):
+    jira, github, pages, _ = setup_pipeline(monkeypatch, tmp_path)
+    get_commits = github.get_commits_with_card
+
+    def failing(repo, card_number):
+        raise RuntimeError("mirror unavailable")
+
+    github.get_commits_with_card = failing
+    run("EPIC-1")
+    github.get_commits_with_card = get_commits
+    assert run("EPIC-1").startswith("✅ Confluence page created: https://wiki.example.com/pages/2")
+    assert run("EPIC-1").startswith("✅ No changes")
@@ -0,0 +1,68 @@
+from summarize_ai import Commit, select_commits
+from summarize_ai.commit_ranker import CommitScore
+
+
+def make_diff(path, lines, text="value = compute()"):
+    return f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n" + "".join(f"+{text} {i}\n" for i in range(lines))
+
+
+def test_fix_messages_are_not_trivial():
+    commit = Commit("repo", "aaaaaaa", make_diff("billing/invoice.py", 8),
+                    "ABC-1 Fix incorrect tax rounding in invoice totals")
+    score = CommitScore(commit)
+    assert score.message_quality > 0
+    assert not score.is_trivial
+    assert CommitScore(Commit("repo", "bbbbbbb", make_diff("app.py", 8), "ABC-1 wip")).message_quality < 0
+
+
+def test_small_card_is_summarized_in_full():
+    commits = [
+        Commit("repo", "aaaaaaa", make_diff("billing/invoice.py", 2), "ABC-1 Fix incorrect tax rounding in invoice totals"),
+        Commit("repo", "bbbbbbb", make_diff("app.py", 1), "typo"),
+        Commit("repo", "ccccccc", make_diff("tests/test_app.py", 5), "ABC-1 Add tests"),
+        Commit("repo", "ddddddd", "", "Merge pull request #12 from org/feature"),
+    ]
+    selection = select_commits(commits, max_commits=5, char_budget=10000)
+    assert [c.sha for c in selection.selected] == ["aaaaaaa", "bbbbbbb", "ccccccc"]
+    assert selection.digest == ""
+    assert selection.merges_skipped == 1
+
+
+def test_large_card_digests_trivial_commits_and_keeps_signals():
+    api = Commit("repo", "aaaaaaa", make_diff("api/routes.py", 3, '@app.get("/invoices")'), "ABC-1 Add invoices endpoint")
+    toggle = Commit("repo", "bbbbbbb", make_diff("app.py", 2, "if is_enabled('new_tax'):"), "ABC-1 Guard new tax rules")
+    big = [Commit("repo", f"c{i:06d}", make_diff(f"src/module{i}.py", 40), f"ABC-1 Rework module {i} calculations")
+           for i in range(5)]
+    trivial = Commit("repo", "ddddddd", make_diff("app.py", 1), "typo")
+    tests_only = Commit("repo", "eeeeeee", make_diff("tests/test_app.py", 30), "ABC-1 Cover rounding edge cases")
+
+    selection = select_commits([trivial, tests_only, *big, api, toggle], max_commits=4, char_budget=100000)
+    selected = {c.sha for c in selection.selected}
+    assert {"aaaaaaa", "bbbbbbb"} <= selected
+    assert len(selected) == 4
+    assert "ddddddd" not in selected and "eeeeeee" not in selected
+    assert selection.digested == 5
+    assert "repo@ddddddd: typo" in selection.digest
+
+
+def test_char_budget_skips_large_commits_and_reverts_are_kept():
+    large = Commit("repo", "aaaaaaa", make_diff("src/big.py", 200), "ABC-1 Rewrite the pricing engine")
+    small = Commit("repo", "bbbbbbb", make_diff("src/small.py", 10), "ABC-1 Tweak discount thresholds")
+    revert = Commit("repo", "ccccccc", make_diff("src/small.py", 1), "Revert something")
+    revert.reverts = small
+
+    selection = select_commits([large, small, revert], max_commits=5, char_budget=1000)
+    assert [c.sha for c in selection.selected] == ["bbbbbbb", "ccccccc"]
+    assert "aaaaaaa" in selection.digest
+
+
+def test_limits_default_to_settings(monkeypatch):
+    import config.settings as settings
+
+    commits = [Commit("repo", f"c{i:06d}", make_diff(f"src/module{i}.py", 40), f"ABC-1 Rework module {i} calculations")
+               for i in range(4)]
+    monkeypatch.setattr(settings, "CARD_MAX_COMMITS", 2)
+    assert len(select_commits(commits).selected) == 2
+    monkeypatch.setattr(settings, "CARD_MAX_COMMITS", 10)
+    monkeypatch.setattr(settings, "CARD_DIFF_CHAR_BUDGET", 10)
+    assert select_commits(commits).selected == []
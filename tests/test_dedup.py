@@ -0,0 +1,74 @@
+from summarize_ai import Card, Commit, deduplicate_commits
+from summarize_ai.dedup import compute_patch_ids
+
+
+def make_diff(path, removed, added):
+    return (f"diff --git a/{path} b/{path}\n--- a/{path}\n+++ b/{path}\n@@ -1,1 +1,1 @@\n"
+            f"-{removed}\n+{added}\n")
+
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, messages):
+        self.calls += 1
+        return type("Response", (), {"content": f"summary {self.calls}"})()
+
+
+def test_patch_id_ignores_whitespace_and_context():
+    diff = make_diff("app.py", "x = 1", "x = 2")
+    reformatted = diff.replace("+x = 2", "+x  =  2").replace("@@ -1,1 +1,1 @@", "@@ -10,1 +10,1 @@")
+    assert compute_patch_ids(diff)[0] == compute_patch_ids(reformatted)[0]
+    assert compute_patch_ids(make_diff("app.py", "x = 2", "x = 1"))[0] == compute_patch_ids(diff)[1]
+    assert compute_patch_ids("") == (None, None)
+
+
+def test_cherry_pick_reuses_summary_and_revert_is_noted():
+    original = Commit("repo-a", "aaaaaaa", make_diff("app.py", "x = 1", "x = 2"), date="2024-01-01T10:00:00Z")
+    picked = Commit("repo-b", "bbbbbbb", make_diff("app.py", "x = 1", "x = 2"), date="2024-01-02T10:00:00Z")
+    revert = Commit("repo-a", "ccccccc", make_diff("app.py", "x = 2", "x = 1"), date="2024-01-03T10:00:00Z")
+
+    report = deduplicate_commits([revert, picked, original])
+    assert (report.duplicates, report.reverts, report.reapplies) == (1, 1, 0)
+    assert picked.duplicate_of is original
+    # A revert undoes the latest copy of the change
+    assert revert.reverts is picked
+
+    llm = FakeLLM()
+    assert picked.summarize(llm) == original.summarize(llm) == "summary 1"
+    assert revert.summarize(llm).startswith("Reverts commit bbbbbbb in repo-b")
+    assert llm.calls == 1
+
+
+def test_reapply_after_revert_is_noted_and_kept_on_card():
+    original = Commit("repo", "aaaaaaa", make_diff("app.py", "x = 1", "x = 2"), date="2024-01-01T10:00:00Z")
+    revert = Commit("repo", "rrrrrrr", make_diff("app.py", "x = 2", "x = 1"), date="2024-01-02T10:00:00Z")
+    reapply = Commit("repo", "bbbbbbb", make_diff("app.py", "x = 1", "x = 2"), date="2024-01-03T10:00:00Z")
+
+    report = deduplicate_commits([reapply, revert, original])
+    assert report.reapplies == 1
+    assert reapply.duplicate_of is original
+    assert reapply.reapplies_after is revert
+    assert reapply.summarize(FakeLLM()).startswith("Re-applies aaaaaaa after revert rrrrrrr")
+
+    prompts = []
+
+    def llm(messages):
+        prompts.append(messages[0].content)
+        return type("Response", (), {"content": "card summary"})()
+
+    Card("ABC-1", "Title", "Description", [original, revert, reapply]).summarize(llm)
+    assert "Re-applies aaaaaaa after revert rrrrrrr" in prompts[-1]
+
+
+def test_dates_with_mixed_offsets_are_compared_as_instants():
+    # 10:00+02:00 is 08:00Z, so it is the original even though its string sorts later
+    earlier = Commit("repo-a", "aaaaaaa", make_diff("app.py", "x = 1", "x = 2"), date="2024-01-01T10:00:00+02:00")
+    later = Commit("repo-b", "bbbbbbb", make_diff("app.py", "x = 1", "x = 2"), date="2024-01-01T09:00:00Z")
+    undated = Commit("repo-c", "ccccccc", make_diff("app.py", "x = 1", "x = 2"), date="not a date")
+
+    deduplicate_commits([later, earlier, undated])
+    assert undated.duplicate_of is None
+    assert earlier.duplicate_of is undated
+    assert later.duplicate_of is undated
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from github_extractor import DiffStore, DiffStoreError, DiffWriter
+
+
+def make_results(card, count=3, repo="repo-a"):
+    return [{"repo": repo, "sha": f"{card[-1]}{i:06d}", "message": f"{card} change {i}", "date": "2024-01-01T00:00:00Z",
+             "diff": f"diff --git a/f{i}.py b/f{i}.py\n+line {i}\n" * 20} for i in range(count)]
+
+
+@pytest.fixture(params=["zstd", "none"])
+def store(request, tmp_path):
+    if request.param == "zstd":
+        pytest.importorskip("zstandard")
+    return DiffStore(str(tmp_path), compression=request.param)
+
+
+def test_round_trip_and_selective_read(store):
+    results = make_results("ABC-1")
+    store.write_card("ABC-1", results)
+
+    assert store.load_commits("ABC-1") == results
+    assert store.load_commits("ABC-1", shas=[results[1]["sha"]]) == [results[1]]
+    assert store.load_commits("ABC-2") is None
+    assert store.has_card("ABC-1") and not store.has_card("ABC-2")
+
+
+def test_rewrite_replaces_previous_data_file(store, tmp_path):
+    store.write_card("ABC-1", make_results("ABC-1", 3))
+    store.write_card("ABC-1", make_results("ABC-1", 1))
+
+    assert len(store.load_commits("ABC-1")) == 1
+    assert len(list(tmp_path.glob("ABC-1.*.diffs"))) == 1
+    assert not list(tmp_path.glob("*.tmp*"))
+
+
+def test_corrupt_and_truncated_files_raise(store, tmp_path):
+    store.write_card("ABC-1", make_results("ABC-1"))
+    index = store.read_index("ABC-1")
+    data_path = tmp_path / index["data_file"]
+    data_path.write_bytes(data_path.read_bytes()[:10])
+    with pytest.raises(DiffStoreError):
+        store.load_commits("ABC-1")
+
+    (tmp_path / "ABC-1.index.json").write_text("{not json")
+    with pytest.raises(DiffStoreError):
+        store.load_commits("ABC-1")
+
+
+def test_legacy_files_are_read(tmp_path):
+    results = make_results("ABC-1", 2)
+    (tmp_path / "ABC-1.json").write_text(json.dumps({"repo-a": results}))
+    assert DiffStore(str(tmp_path), compression="none").load_commits("ABC-1") == results
+
+
+def test_writer_isolates_failures(tmp_path):
+    store = DiffStore(str(tmp_path), compression="none")
+    with DiffWriter(store, max_workers=2) as writer:
+        writer.submit("ABC-1", make_results("ABC-1"))
+        writer.submit("ABC-2", [{"repo": "repo-a", "sha": "bad", "diff": object()}])
+        failures = writer.wait()
+
+    assert list(failures) == ["ABC-2"]
+    assert len(store.load_commits("ABC-1")) == 3
+
+
+def test_writer_chains_duplicate_submits(tmp_path):
+    store = DiffStore(str(tmp_path), compression="none")
+    with DiffWriter(store, max_workers=4) as writer:
+        writer.submit("ABC-1", [{"repo": "repo-a", "sha": "bad", "diff": object()}])
+        for count in (5, 1, 2):
+            writer.submit("ABC-1", make_results("ABC-1", count))
+        failures = writer.wait()
+
+    # The failed first write is still reported, and the last write wins
+    assert list(failures) == ["ABC-1"]
+    assert len(store.load_commits("ABC-1")) == 2
+    assert len(list(tmp_path.glob("ABC-1.*.diffs"))) == 1
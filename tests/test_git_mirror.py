@@ -0,0 +1,174 @@
+import logging
+import shutil
+import subprocess
+import threading
+
+import pytest
+
+from github_extractor import GitMirrorClient, GitMirrorError
+from summarize_ai.dedup import compute_patch_ids
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+
+
+def git(path, *args):
+    return subprocess.run(["git", "-C", str(path), *args], check=True, capture_output=True, text=True).stdout.strip()
+
+
+def commit(path, filename, content, message):
+    (path / filename).write_text(content)
+    git(path, "add", filename)
+    git(path, "commit", "-q", "-m", message)
+    return git(path, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def origin(tmp_path):
+    path = tmp_path / "remotes" / "service-a"
+    path.mkdir(parents=True)
+    git(path, "init", "-q", "-b", "main")
+    git(path, "config", "user.email", "dev@example.com")
+    git(path, "config", "user.name", "Dev")
+    commit(path, "app.py", "x = 1\n", "ABC-1 Add app")
+    return path
+
+
+def make_client(tmp_path, **kwargs):
+    return GitMirrorClient(str(tmp_path / "mirrors"), "org",
+                           remote_url_template=str(tmp_path / "remotes" / "{repo}"), **kwargs)
+
+
+def shas(commits):
+    return [c["sha"] for c in commits]
+
+
+def test_clone_and_lookup(tmp_path, origin):
+    second = commit(origin, "app.py", "x = 2\n", "ABC-1 Change x\n\nAlso mentions ABC-2.")
+    client = make_client(tmp_path)
+
+    commits = client.get_commits_with_card("service-a", "ABC-1")
+    assert (tmp_path / "mirrors" / "service-a.git").is_dir()
+    assert shas(commits)[0] == second and len(commits) == 2
+    assert commits[0]["repo"] == "service-a" and commits[0]["message"].startswith("ABC-1 Change x")
+    assert shas(client.get_commits_with_card("service-a", "ABC-2")) == [second]
+    assert client.get_org_repos("service") == ["service-a"]
+
+
+def test_incremental_fetch_indexes_only_new_commits(tmp_path, origin, caplog):
+    first = git(origin, "rev-parse", "HEAD")
+    make_client(tmp_path).sync("service-a")
+
+    new = commit(origin, "feature.py", "y = 1\n", "ABC-1 Add feature")
+    with caplog.at_level(logging.INFO, logger="github_extractor.git_mirror"):
+        commits = make_client(tmp_path).get_commits_with_card("service-a", "ABC-1")
+    assert shas(commits) == [new, first]
+    assert "Indexed 1 new commits in service-a" in caplog.text
+
+
+def test_only_default_branch_is_indexed_unless_all_branches(tmp_path, origin):
+    first = git(origin, "rev-parse", "HEAD")
+    git(origin, "checkout", "-q", "-b", "feature")
+    feature = commit(origin, "feature.py", "y = 1\n", "ABC-1 Unmerged work")
+    git(origin, "checkout", "-q", "main")
+
+    assert shas(make_client(tmp_path).get_commits_with_card("service-a", "ABC-1")) == [first]
+    # Switching scope rebuilds the index instead of extending the default-branch one
+    commits = make_client(tmp_path, all_branches=True).get_commits_with_card("service-a", "ABC-1")
+    assert shas(commits) == [feature, first]
+
+
+def test_force_push_drops_rewritten_commits(tmp_path, origin):
+    base = git(origin, "rev-parse", "HEAD")
+    dropped = commit(origin, "app.py", "x = 2\n", "ABC-1 Change x")
+    make_client(tmp_path).sync("service-a")
+
+    git(origin, "reset", "-q", "--hard", base)
+    replacement = commit(origin, "app.py", "x = 3\n", "ABC-1 Change x properly")
+    commits = make_client(tmp_path).get_commits_with_card("service-a", "ABC-1")
+    assert shas(commits) == [replacement, base]
+    assert dropped not in shas(commits)
+
+
+def test_commit_diff_has_patch_id(tmp_path, origin):
+    sha = commit(origin, "app.py", "x = 2\n", "ABC-1 Change x")
+    client = make_client(tmp_path)
+    client.sync("service-a")
+
+    diff = client.get_commit_diff("service-a", sha)
+    assert diff.startswith("diff --git a/app.py b/app.py")
+    patch_id, reverse_id = compute_patch_ids(diff)
+    assert patch_id is not None and reverse_id is not None
+    assert client.get_commit_diff("service-a", "0" * 40).startswith("Error fetching diff")
+
+
+def test_missing_remote_raises(tmp_path):
+    with pytest.raises(GitMirrorError):
+        make_client(tmp_path).get_commits_with_card("missing", "ABC-1")
+
+
+def test_repo_head_covers_indexed_branches(tmp_path, origin):
+    client, all_client = make_client(tmp_path), make_client(tmp_path, all_branches=True)
+    before, all_before = client.get_repo_head("service-a"), all_client.get_repo_head("service-a")
+
+    git(origin, "checkout", "-q", "-b", "feature")
+    commit(origin, "feature.py", "y = 1\n", "ABC-1 Add feature")
+    git(origin, "checkout", "-q", "main")
+    after = client.get_repo_heads(["service-a", "missing"])
+    assert before is not None and after["service-a"] == before
+    assert after["missing"] is None
+    assert all_client.get_repo_head("service-a") not in (None, all_before)
+
+
+def test_concurrent_clients_share_the_mirror_lock(tmp_path, origin):
+    make_client(tmp_path).sync("service-a")
+    expected = [commit(origin, "app.py", f"x = {i}\n", f"ABC-1 Change x to {i}") for i in range(3)][::-1]
+
+    results, errors = [], []
+
+    def run():
+        try:
+            results.append(shas(make_client(tmp_path).get_commits_with_card("service-a", "ABC-1"))[:3])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert results == [expected] * 6
+
+
+def test_token_is_not_passed_on_the_command_line(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_run(command, **kwargs):
+        calls.append((command, kwargs.get("env") or {}))
+        return subprocess.CompletedProcess(command, 0, stdout="", stderr="")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    monkeypatch.setenv("GIT_CONFIG_COUNT", "1")
+    client = GitMirrorClient(str(tmp_path / "mirrors"), "org", token="secret-token")
+    client.get_repo_head("service-a")
+
+    command, env = calls[0]
+    assert not any("secret" in arg or "extraHeader" in arg for arg in command)
+    assert env["GIT_CONFIG_COUNT"] == "2"
+    assert env["GIT_CONFIG_KEY_1"] == "http.extraHeader"
+    assert env["GIT_CONFIG_VALUE_1"].startswith("Authorization: Basic ")
+
+
+def test_new_commits_since_a_head(tmp_path, origin):
+    client = make_client(tmp_path)
+    base = client.get_repo_head("service-a")
+    assert base == git(origin, "rev-parse", "HEAD")
+
+    new = commit(origin, "app.py", "x = 2\n", "ABC-1 Change x")
+    commits = make_client(tmp_path).get_new_commits("service-a", base, client.get_repo_head("service-a"))
+    assert [(c["sha"], c["message"]) for c in commits] == [(new, "ABC-1 Change x")]
+
+    git(origin, "reset", "-q", "--hard", base)
+    commit(origin, "app.py", "x = 3\n", "ABC-1 Change x again")
+    assert make_client(tmp_path).get_new_commits("service-a", new, "ignored") is None
+    assert make_client(tmp_path, all_branches=True).get_new_commits("service-a", base, "ignored") is None
@@ -0,0 +1,41 @@
+import requests
+
+from github_extractor import GitHubClient
+
+
+class FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+def make_commit(sha, message):
+    return {"sha": sha, "commit": {"message": message, "author": {"date": "2024-01-01T00:00:00Z"}}}
+
+
+def test_new_commits_are_paged_from_compare(monkeypatch):
+    pages = {1: [make_commit("a" * 40, "ABC-1 Change x")] * 100, 2: [make_commit("b" * 40, "Other change")]}
+    requested = []
+
+    def fake_get(url, headers=None, params=None):
+        requested.append((url, params["page"]))
+        return FakeResponse(200, {"status": "ahead", "total_commits": 101, "commits": pages[params["page"]]})
+
+    monkeypatch.setattr(requests, "get", fake_get)
+    commits = GitHubClient("token", "org").get_new_commits("service-a", "base", "head")
+    assert len(commits) == 101
+    assert commits[-1] == {"repo": "service-a", "sha": "b" * 40, "message": "Other change", "date": "2024-01-01T00:00:00Z"}
+    assert requested == [("https://api.github.com/repos/org/service-a/compare/base...head", 1),
+                         ("https://api.github.com/repos/org/service-a/compare/base...head", 2)]
+
+
+def test_new_commits_unavailable_after_force_push_or_error(monkeypatch):
+    responses = [FakeResponse(200, {"status": "diverged", "total_commits": 1, "commits": []}),
+                 FakeResponse(404, {})]
+    monkeypatch.setattr(requests, "get", lambda url, headers=None, params=None: responses.pop(0))
+    client = GitHubClient("token", "org")
+    assert client.get_new_commits("service-a", "base", "head") is None
+    assert client.get_new_commits("service-a", "base", "head") is None
@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+
+from summarize_ai import LLMExecutor, LLMRateLimiter
+from summarize_ai.llm_executor import (LLMTimeoutError, TokenBucket, get_retry_after, is_rate_limit_error,
+                                       is_retryable_error)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class FakeModel:
+    """Chat model stub returning `responses` in order; exceptions are raised, numbers are delays."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, messages):
+        with self._lock:
+            self.calls += 1
+            response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, BaseException):
+            raise response
+        if isinstance(response, (int, float)):
+            time.sleep(response)
+            return f"slow after {response}s"
+        return response
+
+
+def test_token_bucket_waits_for_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock, sleep=clock.sleep)
+    for _ in range(60):
+        assert bucket.acquire() == 0
+    # One token per second at 60 per minute
+    assert bucket.acquire() == pytest.approx(1.0)
+
+    bucket.block_for(5)
+    assert bucket.acquire() == pytest.approx(5.0)
+
+
+def test_rate_limiter_halves_on_rate_limit_and_recovers():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(60, 10000, recovery_step=0.25, clock=clock, sleep=clock.sleep)
+    limiter.on_rate_limited()
+    assert limiter.current_requests_per_minute == 30
+    limiter.on_rate_limited(retry_after=10)
+    assert limiter.current_requests_per_minute == 15
+    assert limiter.acquire(1) >= 10
+
+    for _ in range(10):
+        limiter.on_success()
+    assert limiter.current_requests_per_minute == 60
+
+
+def test_retry_after_is_read_from_headers_and_messages():
+    class WithHeaders(Exception):
+        response = type("Response", (), {"headers": {"Retry-After": "7"}})()
+
+    assert get_retry_after(WithHeaders()) == 7.0
+    assert get_retry_after(Exception("429 Quota exceeded. Please retry in 12.5s.")) == 12.5
+    assert get_retry_after(Exception("boom")) is None
+
+
+def test_executor_retries_transient_errors_and_honors_retry_after():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(60, 10000, clock=clock, sleep=clock.sleep)
+    model = FakeModel(RateLimitError("retry in 3s"), "ok")
+    executor = LLMExecutor(model, limiter, timeout=5, max_retries=2, sleep=clock.sleep)
+    try:
+        assert executor(["hello"]) == "ok"
+    finally:
+        executor.close()
+    assert model.calls == 2
+    assert clock.slept[0] >= 3
+    assert limiter.current_requests_per_minute == pytest.approx(30 + 60 * 0.05)
+
+
+def test_executor_does_not_retry_permanent_errors():
+    model = FakeModel(ValueError("invalid prompt"))
+    executor = LLMExecutor(model, max_retries=3, sleep=lambda s: None)
+    try:
+        with pytest.raises(ValueError):
+            executor(["hello"])
+    finally:
+        executor.close()
+    assert model.calls == 1
+
+
+def test_executor_hedges_slow_calls():
+    model = FakeModel(1.0, "fast")
+    executor = LLMExecutor(model, timeout=5, max_retries=0, hedge_after=0.05)
+    try:
+        start = time.monotonic()
+        assert executor(["hello"]) == "fast"
+        assert time.monotonic() - start < 0.9
+    finally:
+        executor.close()
+    assert model.calls == 2
+
+
+def test_executor_times_out():
+    model = FakeModel(1.0)
+    executor = LLMExecutor(model, timeout=0.05, max_retries=0)
+    try:
+        with pytest.raises(LLMTimeoutError):
+            executor(["hello"])
+    finally:
+        executor.close()
+
+
+def test_status_codes_are_matched_as_words():
+    assert not is_retryable_error(ValueError("Prompt of 15000 tokens exceeds the 5030 token limit"))
+    assert not is_rate_limit_error(ValueError("Request 14290 rejected"))
+    assert is_rate_limit_error(Exception("429 Too Many Requests"))
+    assert is_retryable_error(Exception("503 Service Unavailable"))
+    assert is_rate_limit_error(Exception("ResourceExhausted: quota exceeded"))
+
+
+def test_limiter_wait_does_not_count_against_timeout():
+    class SlowLimiter(LLMRateLimiter):
+        def acquire(self, tokens):
+            time.sleep(0.2)
+            return 0.2
+
+    model = FakeModel(0.1)
+    executor = LLMExecutor(model, SlowLimiter(60, 10000), timeout=0.15, max_retries=0)
+    try:
+        assert executor(["hello"]) == "slow after 0.1s"
+    finally:
+        executor.close()
+
+
+def test_hedge_is_skipped_without_limiter_capacity():
+    clock = FakeClock()
+    limiter = LLMRateLimiter(1, 10000, clock=clock, sleep=clock.sleep)
+    model = FakeModel(0.2)
+    executor = LLMExecutor(model, limiter, timeout=5, max_retries=0, hedge_after=0.05)
+    try:
+        assert executor(["hello"]) == "slow after 0.2s"
+    finally:
+        executor.close()
+    assert model.calls == 1
+    assert limiter.try_acquire(1) is False
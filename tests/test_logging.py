@@ -0,0 +1,37 @@
+import logging
+
+from common import ContextThreadPoolExecutor, get_sampled_logger, log_context
+from common.logging import ContextFilter, JsonFormatter
+
+
+def make_record(message="hello"):
+    record = logging.LogRecord("test", logging.INFO, __file__, 1, message, (), None)
+    ContextFilter().filter(record)
+    return record
+
+
+def test_context_is_attached_to_records():
+    with log_context(run_id="run1", epic="EPIC-1"):
+        record = make_record()
+    assert (record.run_id, record.epic, record.stage) == ("run1", "EPIC-1", None)
+    assert '"run_id": "run1"' in JsonFormatter().format(record)
+    assert make_record().run_id is None
+
+
+def test_context_pool_propagates_context_to_worker_threads():
+    with ContextThreadPoolExecutor(max_workers=2) as pool:
+        with log_context(run_id="run1", stage="github"):
+            records = list(pool.map(lambda _: make_record(), range(4)))
+            submitted = pool.submit(make_record)
+        assert submitted.result().stage == "github"
+    assert {(r.run_id, r.stage) for r in records} == {("run1", "github")}
+
+
+def test_sampled_logger_suppresses_repeats(caplog):
+    sampled = get_sampled_logger("tests.sampled", every=5, first=2)
+    with caplog.at_level(logging.DEBUG, logger="tests.sampled"):
+        for i in range(12):
+            sampled.info("item %d", i)
+    messages = [r.getMessage() for r in caplog.records if r.name == "tests.sampled"]
+    assert messages == ["item 0", "item 1", "item 6 (4 similar messages suppressed)",
+                        "item 11 (4 similar messages suppressed)"]
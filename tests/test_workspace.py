@@ -0,0 +1,66 @@
+import os
+import time
+
+import pytest
+
+from confluence_uploader import convert_markdown_to_html
+from services import RunWorkspace, cleanup_stale_workspaces
+from summarize_ai import ChangeLogGenerator
+
+
+def make_old(path, age_seconds):
+    old = time.time() - age_seconds
+    os.utime(path, (old, old))
+
+
+def test_runs_get_separate_workspaces(tmp_path):
+    with RunWorkspace(root=str(tmp_path)) as first, RunWorkspace(root=str(tmp_path)) as second:
+        assert first.run_id != second.run_id
+        assert os.path.isdir(first.commit_diffs_dir) and os.path.isdir(second.commit_diffs_dir)
+        assert first.commit_diffs_dir != second.commit_diffs_dir
+        assert first.changelog_file != second.changelog_file
+        assert first.changelog_file.startswith(str(first.path))
+
+
+def test_cleanup_removes_only_expired_inactive_workspaces(tmp_path):
+    with RunWorkspace("expired", root=str(tmp_path)):
+        pass
+    with RunWorkspace("recent", root=str(tmp_path)):
+        pass
+    make_old(tmp_path / "expired", 3600)
+
+    with RunWorkspace("active", root=str(tmp_path)):
+        make_old(tmp_path / "active", 3600)
+        assert cleanup_stale_workspaces(str(tmp_path), max_age_seconds=60) == 1
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["active", "recent"]
+
+    # Leaving the run refreshes its mtime, so it is kept for another full TTL
+    assert cleanup_stale_workspaces(str(tmp_path), max_age_seconds=60) == 0
+    assert cleanup_stale_workspaces(str(tmp_path / "missing"), max_age_seconds=60) == 0
+
+
+def test_changelog_is_handed_off_in_memory(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    class FakeEpic:
+        id, title, cards = "EPIC-1", "Epic", []
+
+        def summarize(self, llm):
+            return "# Changelog"
+
+    generator = ChangeLogGenerator(llm=None)
+    assert generator.generate(FakeEpic()) == "# Changelog"
+    assert list(tmp_path.iterdir()) == []
+
+    output = tmp_path / "changelog.md"
+    assert generator.generate(FakeEpic(), str(output)) == "# Changelog"
+    assert output.read_text() == "# Changelog"
+
+
+def test_markdown_conversion_inputs(tmp_path):
+    path = tmp_path / "changelog.md"
+    path.write_text("# From file")
+    assert convert_markdown_to_html(markdown_text="# In memory") == "# In memory"
+    assert convert_markdown_to_html(str(path)) == "# From file"
+    with pytest.raises(ValueError):
+        convert_markdown_to_html()